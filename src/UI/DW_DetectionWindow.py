@@ -79,6 +79,14 @@ class DWDetectionWindow(QMainWindow):
         # Load existing particle data if available
         self.load_particle_data()
 
+    def closeEvent(self, event):
+        """Finish background work before the window is torn down."""
+        # A running QThread must not be destroyed with its widget; let any filter apply,
+        # including a debounced edit, finish replacing its output file
+        self.left_panel.filtering_widget.wait_for_pending_filters()
+        self.errant_particle_gallery.stop_prefetch_threads()
+        super().closeEvent(event)
+
     def setup_ui(self):
         # Main Widget
         self.central_widget = QWidget()
@@ -185,6 +193,9 @@ class DWDetectionWindow(QMainWindow):
         )
 
         # Connect filtered data updates
+        self.left_panel.filtering_widget.filteredDataUpdated.connect(
+            self.frame_player.set_filtered_particles
+        )
         self.left_panel.filtering_widget.filteredParticlesUpdated.connect(
             self.frame_player.refresh_frame
         )
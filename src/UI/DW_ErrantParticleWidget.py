@@ -11,8 +11,8 @@ Date: 2025-12-08
 
 import json
 import os
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Qt, Signal, QFileSystemWatcher, QThread, QTimer
+from PySide6.QtGui import QImage, QPixmap, QPixmapCache
 from PySide6.QtWidgets import (
     QCheckBox,
     QHBoxLayout,
@@ -26,6 +26,31 @@ from PySide6.QtWidgets import (
 from ..utils.ScaledLabel import ScaledLabel
 from ..utils import ParticleProcessing
 
+# (value key, threshold key, value label, threshold label) for each errant particle type,
+# checked in order; the first pair present in a particle's metadata is displayed
+_INFO_FIELDS = (
+    ("mass", "min_mass", "Mass", "Min mass"),
+    ("size", "min_size", "Size", "Min size"),
+)
+
+
+class PixmapPrefetchThread(QThread):
+    """Thread for decoding errant particle crops ahead of navigation."""
+
+    image_loaded = Signal(str, QImage)  # cache key, decoded image
+
+    def __init__(self, requests, parent=None):
+        """Initialize with a list of (cache key, file path) pairs to decode."""
+        super().__init__(parent)
+        self.requests = requests
+
+    def run(self):
+        """Decode each image; QPixmap conversion is left to the GUI thread."""
+        for key, file_path in self.requests:
+            if self.isInterruptionRequested():
+                return
+            self.image_loaded.emit(key, QImage(file_path))
+
 
 class DWErrantParticleWidget(QWidget):
     """Widget for displaying errant particles."""
@@ -39,13 +64,21 @@ class DWErrantParticleWidget(QWidget):
 
         self.layout = QVBoxLayout(self)
 
+        # Decoded crops are cached by path and mtime so revisiting a particle skips the PNG decode
+        QPixmapCache.setCacheLimit(max(QPixmapCache.cacheLimit(), 20480))
+
         # photo - fixed 200x200 size, centered
         self.photo_label = ScaledLabel("Photo display")
         self.photo_label.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.photo_label, 1)  # Add with stretch factor
 
-        # Store particle data from JSON
+        # Store particle data from JSON, plus parallel per-particle lists derived from it
         self.particle_data = []
+        self.particle_files = []
+        self._crop_cache_keys = {}
+        self.particle_frames = []
+        self.particle_positions = []
+        self.particle_info_texts = []
         self.current_frame_number = -1
 
         # info
@@ -58,12 +91,14 @@ class DWErrantParticleWidget(QWidget):
         self.prev_frame_button = QPushButton("◀")
         self.frame_number_display = QLineEdit("0 / 0")
         self.curr_particle_idx = 0
+        # Guards _jump_to_input_particle while the display text is set programmatically
+        self._updating_text = False
         self.frame_number_display.setReadOnly(False)
         self.frame_number_display.setAlignment(Qt.AlignCenter)
         self.next_frame_button = QPushButton("▶")
         self.prev_frame_button.clicked.connect(self.prev_particle)
         self.next_frame_button.clicked.connect(self.next_particle)
-        self.frame_number_display.returnPressed.connect(self._jump_to_input_particle)
+        # editingFinished also fires on Enter, so returnPressed is not connected separately
         self.frame_number_display.editingFinished.connect(self._jump_to_input_particle)
         self.frame_nav_layout.addWidget(self.prev_frame_button)
         self.frame_nav_layout.addWidget(self.frame_number_display)
@@ -76,9 +111,35 @@ class DWErrantParticleWidget(QWidget):
 
         self.layout.addLayout(self.frame_nav_layout)
 
+        # Coalesce update_required so fast navigation triggers at most one frame redraw per interval
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(30)
+        self._update_timer.timeout.connect(self.update_required.emit)
+
+        # Refresh when particles_dir changes on disk, debounced so a regeneration's burst of
+        # file writes results in a single reload
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(150)
+        self._refresh_timer.timeout.connect(self._request_refresh)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(lambda _path: self._refresh_timer.start())
+
         # particles directory and files
         self.particles_dir = ""
         self.current_pixmap = None
+        # Cache key of current_pixmap, so redisplaying the same crop reuses it
+        self._current_pixmap_key = None
+        # (mtime_ns, size) of the errant_particles.json last loaded, used to skip unchanged reloads
+        self._json_signature = None
+        # Set when a refresh was requested while hidden; handled in showEvent
+        self._needs_refresh = False
+        # Neighbor crops being decoded in the background, and the threads doing it
+        self._prefetch_pending = set()
+        self._prefetch_threads = []
+        # (index, pixmap cache key, JSON signature) of the particle currently shown
+        self._last_displayed = None
 
         # show initial particle if available
         self._display_particle(self.curr_particle_idx)
@@ -89,13 +150,10 @@ class DWErrantParticleWidget(QWidget):
 
     def get_current_particle_info(self):
         """Returns a dict with info of the currently displayed particle."""
-        if 0 <= self.curr_particle_idx < len(self.particle_data):
-            particle_info = self.particle_data[self.curr_particle_idx]
-            return {
-                "frame": particle_info.get("frame"),
-                "x": particle_info.get("x"),
-                "y": particle_info.get("y"),
-            }
+        index = self.curr_particle_idx
+        if 0 <= index < len(self.particle_data):
+            x, y = self.particle_positions[index]
+            return {"frame": self.particle_frames[index], "x": x, "y": y}
         return None
 
     def regenerate_errant_particles(self):
@@ -105,10 +163,15 @@ class DWErrantParticleWidget(QWidget):
 
         params = self.config_manager.get_detection_params()
 
+        was_watched = self.particles_dir in self._watcher.directories()
+
         # This function now uses filtered_particles.csv internally
         ParticleProcessing.save_errant_particle_crops_for_frame(params)
 
-        self.refresh_particles()
+        # The watcher picks up the rewritten files; refresh directly only if it was not watching
+        self._watch_particles_dir()
+        if not was_watched:
+            self._request_refresh()
 
     def set_config_manager(self, config_manager):
         """Set the config manager for this widget."""
@@ -119,22 +182,40 @@ class DWErrantParticleWidget(QWidget):
         self.file_controller = file_controller
         if self.file_controller:
             self.particles_dir = self.file_controller.errant_particles_folder
+            self._watch_particles_dir()
+            self._request_refresh()
+
+    def _watch_particles_dir(self):
+        """Point the directory watcher at particles_dir if it exists."""
+        watched = self._watcher.directories()
+        if self.particles_dir in watched:
+            return
+        if watched:
+            self._watcher.removePaths(watched)
+        if self.particles_dir and os.path.isdir(self.particles_dir):
+            self._watcher.addPath(self.particles_dir)
+
+    def showEvent(self, event):
+        """Run any refresh that was deferred while the widget was hidden."""
+        super().showEvent(event)
+        if self._needs_refresh:
+            self._needs_refresh = False
             self.refresh_particles()
 
+    def _request_refresh(self):
+        """Refresh now if the widget is visible, otherwise on the next show."""
+        if self.isVisible():
+            self._needs_refresh = False
+            self.refresh_particles()
+        else:
+            self._needs_refresh = True
+
     def refresh_particles(self):
         """Reload the list of particle image files and refresh display."""
         if not self.particles_dir:
             return
 
-        json_path = os.path.join(self.particles_dir, "errant_particles.json")
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, "r") as f:
-                    self.particle_data = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                self.particle_data = []
-        else:
-            self.particle_data = []
+        self._load_particle_data()
 
         # clamp current index within bounds
         if self.particle_data:
@@ -143,12 +224,49 @@ class DWErrantParticleWidget(QWidget):
             self.curr_particle_idx = 0
         self._display_particle(self.curr_particle_idx)
 
+    def _load_particle_data(self):
+        """Load errant_particles.json, skipping the parse if it is unchanged since the last load."""
+        json_path = os.path.join(self.particles_dir, "errant_particles.json")
+        try:
+            stat = os.stat(json_path)
+        except OSError:
+            self._set_particle_data([])
+            self._json_signature = None
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._json_signature:
+            return
+
+        try:
+            with open(json_path, "r") as f:
+                self._set_particle_data(json.load(f))
+            self._json_signature = signature
+        except (json.JSONDecodeError, IOError):
+            self._set_particle_data([])
+            self._json_signature = None
+
+    def _set_particle_data(self, particle_data):
+        """Store particle metadata and precompute the per-particle values used on display."""
+        self.particle_data = particle_data
+        self.particle_files = [
+            os.path.join(self.particles_dir, info["image_file"]) if info.get("image_file") else None
+            for info in particle_data
+        ]
+        self._crop_cache_keys = self._scan_crop_cache_keys() if particle_data else {}
+        self.particle_frames = [info.get("frame") for info in particle_data]
+        self.particle_positions = [(info.get("x"), info.get("y")) for info in particle_data]
+        self.particle_info_texts = [self._format_particle_info(info) for info in particle_data]
+
     def clear_gallery(self):
         """Clears all displayed errant particles and deletes the corresponding files."""
         if self.file_controller:
+            self.stop_prefetch_threads(wait=False)
             try:
                 self.file_controller.delete_all_files_in_folder(self.particles_dir)
-                self.particle_data = []
+                self._set_particle_data([])
+                self._json_signature = None
+                self._last_displayed = None
                 self.curr_particle_idx = 0
                 self._display_particle(self.curr_particle_idx)
                 print(f"Cleared errant particle gallery and deleted files in {self.particles_dir}")
@@ -157,60 +275,147 @@ class DWErrantParticleWidget(QWidget):
 
     def reset_state(self):
         """Reset gallery state and reload particles from disk."""
+        self.stop_prefetch_threads(wait=False)
         self.current_frame_number = -1
         self.curr_particle_idx = 0
-        self.particle_data = []
-        self.refresh_particles()
+        self._set_particle_data([])
+        self._json_signature = None
+        self._last_displayed = None
+        self._request_refresh()
 
     def _display_particle(self, index):
         """Update UI to display particle image and index if within bounds."""
         if 0 <= index < len(self.particle_data):
 
-            particle_info = self.particle_data[index]
-            image_file = particle_info.get("image_file")
-            if not image_file:
+            file_path = self.particle_files[index]
+            if not file_path:
+                self._last_displayed = None
                 self.photo_label.setText("Image not found in metadata")
                 self._update_display_text()
                 return
 
-            file_path = os.path.join(self.particles_dir, image_file)
+            # Nothing to reload if the same particle, crop file and metadata are already shown
+            key = self._pixmap_cache_key(file_path)
+            displayed = (index, key, self._json_signature)
+            if key is not None and displayed == self._last_displayed:
+                self._update_display_text()
+                return
+            self._last_displayed = displayed
 
-            pixmap = QPixmap(file_path)
-            if not pixmap.isNull():
-                self.current_pixmap = pixmap
-                self.photo_label.setPixmap(self.current_pixmap)
-            else:
-                self.photo_label.setText("Failed to load image")
-
-            # Display info from the loaded JSON data
-            display_text = ""
-            mass = particle_info.get("mass")
-            min_mass = particle_info.get("min_mass")
-            size = particle_info.get("size")
-            min_size = particle_info.get("min_size")
-
-            if mass is not None and min_mass is not None:
-                display_text = f"Mass: {mass:.2f}\nMin mass: {min_mass:.2f}"
-            elif size is not None and min_size is not None:
-                display_text = f"Size: {size:.2f}\nMin size: {min_size:.2f}"
-
-            self.info_label.setText(display_text)
+            if key is None or key != self._current_pixmap_key or self.current_pixmap is None:
+                pixmap = self._load_pixmap(file_path, key)
+                if pixmap is not None:
+                    self.current_pixmap = pixmap
+                    self._current_pixmap_key = key
+                    self.photo_label.setPixmap(self.current_pixmap)
+                else:
+                    self.current_pixmap = None
+                    self._current_pixmap_key = None
+                    self.photo_label.setText("Failed to load image")
+
+            self.info_label.setText(self.particle_info_texts[index])
 
             self._update_display_text()
 
             # If checkbox is checked, notify the main window to update the view
             if self.is_show_on_frame_checked():
-                self.update_required.emit()
+                self._update_timer.start()
+
+            self._prefetch_neighbors(index)
         else:
             # out of bounds or no files
+            self._last_displayed = None
             if not self.particle_data:
                 self.photo_label.setText("No particle images found")
             self.info_label.setText("")
             self._update_display_text()
 
+    def _scan_crop_cache_keys(self):
+        """Build QPixmapCache keys for every crop in particles_dir in a single directory pass."""
+        cache_keys = {}
+        try:
+            with os.scandir(self.particles_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        cache_keys[entry.path] = f"{entry.path}:{entry.stat().st_mtime_ns}"
+        except OSError:
+            pass
+        return cache_keys
+
+    def _pixmap_cache_key(self, file_path):
+        """Return the QPixmapCache key for a crop file, or None if the file is missing."""
+        return self._crop_cache_keys.get(file_path)
+
+    def _load_pixmap(self, file_path, key):
+        """Return the pixmap for an errant particle crop, or None if it cannot be loaded."""
+        if key is None:
+            return None
+
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QPixmap(file_path)
+            if pixmap.isNull():
+                return None
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+
+    def _prefetch_neighbors(self, index):
+        """Decode the crops around index in a background thread so next/prev display instantly."""
+        requests = []
+        for neighbor in (index + 1, index + 2, index - 1):
+            if not 0 <= neighbor < len(self.particle_files):
+                continue
+            file_path = self.particle_files[neighbor]
+            if not file_path:
+                continue
+            key = self._pixmap_cache_key(file_path)
+            if key is None or key in self._prefetch_pending:
+                continue
+            cached = QPixmapCache.find(key)
+            if cached is not None and not cached.isNull():
+                continue
+            self._prefetch_pending.add(key)
+            requests.append((key, file_path))
+
+        if not requests:
+            return
+
+        thread = PixmapPrefetchThread(requests, self)
+        thread.image_loaded.connect(self._on_prefetched_image)
+        thread.finished.connect(lambda: self._prefetch_threads.remove(thread))
+        thread.finished.connect(thread.deleteLater)
+        self._prefetch_threads.append(thread)
+        thread.start()
+
+    def stop_prefetch_threads(self, wait=True):
+        """Ask running prefetch threads to stop, and by default wait for them to exit."""
+        for thread in list(self._prefetch_threads):
+            if not thread.isInterruptionRequested():
+                thread.requestInterruption()
+                # Stop delivering crops for particles this gallery no longer shows
+                thread.image_loaded.disconnect(self._on_prefetched_image)
+            if wait:
+                thread.wait()
+        self._prefetch_pending.clear()
+
+    def _on_prefetched_image(self, key, image):
+        """Convert a prefetched image to a pixmap and add it to the cache."""
+        self._prefetch_pending.discard(key)
+        if not image.isNull():
+            QPixmapCache.insert(key, QPixmap.fromImage(image))
+
+    def _format_particle_info(self, particle_info):
+        """Return the info label text for one particle's metadata."""
+        for value_key, min_key, value_label, min_label in _INFO_FIELDS:
+            value = particle_info.get(value_key)
+            min_value = particle_info.get(min_key)
+            if value is not None and min_value is not None:
+                return f"{value_label}: {value:.2f}\n{min_label}: {min_value:.2f}"
+        return ""
+
     def _on_show_particle_checkbox_changed(self, state):
         """Handle state change of 'Show particle on frame' checkbox."""
-        self.update_required.emit()
+        self._update_timer.start()
 
     def next_particle(self):
         """Advance to the next particle and update display."""
@@ -238,13 +443,15 @@ class DWErrantParticleWidget(QWidget):
         total = len(self.particle_data)
         current_display = self.curr_particle_idx + 1 if total > 0 else 0
         text = f"{current_display} / {total}"
-        # avoid recursive signals while editing
-        old_block = self.frame_number_display.blockSignals(True)
+        # avoid recursive jumps while editing
+        self._updating_text = True
         self.frame_number_display.setText(text)
-        self.frame_number_display.blockSignals(old_block)
+        self._updating_text = False
 
     def _jump_to_input_particle(self):
         """Parse the input and jump to the requested particle index if valid."""
+        if self._updating_text:
+            return
         text = self.frame_number_display.text().strip()
         # Accept formats like "12" or "12 / 200"
         if "/" in text:
@@ -11,8 +11,12 @@ Date: 2025-12-08
 
 import cv2
 import os
+import queue
+import threading
 import pandas as pd
-from PySide6.QtCore import Qt, Signal, QThread
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -24,8 +28,78 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QGridLayout,
 )
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QImage, QPixmap
 from ..utils.ScaledLabel import ScaledLabel
+from ..utils.FileController import FRAME_FILENAME_RE
+from ..utils.ParticleProcessing import _get_invert_setting, calculate_optimal_annotation_color
+
+# Decoded frames kept in memory for navigating back and forth
+_FRAME_CACHE_SIZE = 16
+
+# Shared result for frames without particles
+_EMPTY_PARTICLES = pd.DataFrame()
+
+# imread flags for JPEG decoding at 1/factor resolution, largest factor first
+_REDUCED_READ_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    1: cv2.IMREAD_COLOR,
+}
+
+
+class _FramePool:
+    """A bounded set of reusable frame buffers shared by the decoder and the writers."""
+
+    def __init__(self, capacity):
+        """Initialize an empty pool that hands out at most `capacity` buffers."""
+        self._free = queue.Queue()
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._allocated = 0
+
+    def acquire(self):
+        """
+        Return a free buffer to decode into, blocking while all are in use. Returns None
+        while the pool is still filling, so the decoder allocates a buffer that then joins
+        the pool when released.
+        """
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._allocated < self._capacity:
+                self._allocated += 1
+                return None
+        return self._free.get()
+
+    def release(self, frame):
+        """Return a buffer to the pool."""
+        self._free.put(frame)
+
+
+def _write_frame(frame_path, frame, pool):
+    """JPEG-encode and write one frame, then return its buffer to the pool."""
+    try:
+        if not cv2.imwrite(frame_path, frame):
+            print(f"Warning: Failed to write frame: {frame_path}")
+    finally:
+        pool.release(frame)
+
+
+def _open_gpu_reader(video_path):
+    """Open an NVDEC-backed video reader if OpenCV was built with CUDA decoding, else None."""
+    cudacodec = getattr(cv2, "cudacodec", None)
+    if cudacodec is None:
+        return None
+    try:
+        if cv2.cuda.getCudaEnabledDeviceCount() == 0:
+            return None
+        return cudacodec.createVideoReader(video_path)
+    except cv2.error:
+        # No usable GPU or codec for this file; decode on the CPU instead
+        return None
 
 
 class SaveFramesThread(QThread):
@@ -42,20 +116,30 @@ class SaveFramesThread(QThread):
     def run(self):
         """Extract frames from video and save them to disk"""
         try:
-            self.cap = cv2.VideoCapture(self.video_path)
-            if not self.cap.isOpened():
-                return
-
+            gpu_reader = _open_gpu_reader(self.video_path)
+            if gpu_reader is None:
+                self.cap = cv2.VideoCapture(self.video_path)
+                if not self.cap.isOpened():
+                    return
+
+            # Decoding stays on this thread while a pool encodes and writes frames; OpenCV
+            # releases the GIL in both. Frames are decoded into a fixed set of recycled
+            # buffers, which also caps how many decoded frames can wait to be written
+            workers = os.cpu_count() or 1
+            pool = _FramePool(2 * workers)
+            frame_prefix = os.path.join(self.output_folder, "frame_")
             frame_idx = 0
-            while True:
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                while True:
+                    frame = self._read_next_frame(gpu_reader, pool.acquire())
+                    if frame is None:
+                        break
 
-                frame_path = os.path.join(self.output_folder, f"frame_{frame_idx:05d}.jpg")
-                cv2.imwrite(frame_path, frame)
-                frame_idx += 1
+                    frame_path = f"{frame_prefix}{frame_idx:05d}.jpg"
+                    executor.submit(_write_frame, frame_path, frame, pool)
+                    frame_idx += 1
 
+            # Leaving the executor waits for every write, so all frames are on disk here
             self.save_complete.emit(frame_idx)
 
         except Exception as e:
@@ -64,6 +148,20 @@ class SaveFramesThread(QThread):
             if self.cap:
                 self.cap.release()
 
+    def _read_next_frame(self, gpu_reader, buffer=None):
+        """
+        Decode the next BGR frame on the GPU reader if there is one, else the capture.
+        The frame is written into `buffer` when it has the right shape.
+        """
+        if gpu_reader is not None:
+            ret, gpu_frame = gpu_reader.nextFrame()
+            if not ret:
+                return None
+            # NVDEC hands frames back as BGRA
+            return cv2.cvtColor(gpu_frame.download(), cv2.COLOR_BGRA2BGR, dst=buffer)
+        ret, frame = self.cap.read(buffer)
+        return frame if ret else None
+
 
 class DWFrameGalleryWidget(QWidget):
     """Widget for displaying video frames from a folder of images"""
@@ -85,6 +183,7 @@ class DWFrameGalleryWidget(QWidget):
         if config_manager:
             self.original_frames_folder = config_manager.get_path("original_frames_folder")
             self.annotated_frames_folder = config_manager.get_path("annotated_frames_folder")
+            self._update_frame_path_prefix()
             self.update_feature_size()
 
     def update_feature_size(self):
@@ -98,6 +197,13 @@ class DWFrameGalleryWidget(QWidget):
         if file_controller:
             self.original_frames_folder = file_controller.original_frames_folder
             self.annotated_frames_folder = file_controller.annotated_frames_folder
+            self._update_frame_path_prefix()
+
+    def _update_frame_path_prefix(self):
+        """Precompute the shared start of every original frame path."""
+        # Joined once per folder change so building a frame path while scrubbing is a
+        # single string format
+        self._frame_path_prefix = os.path.join(self.original_frames_folder, "frame_")
 
     def set_errant_particle_gallery(self, gallery_widget):
         """Set the errant particle gallery widget."""
@@ -124,6 +230,7 @@ class DWFrameGalleryWidget(QWidget):
         self.frame_slider = QSlider(Qt.Horizontal)
         self.frame_slider.setRange(0, 0)
         self.frame_slider.valueChanged.connect(self.slider_value_changed)
+        self.frame_slider.sliderReleased.connect(self.slider_released)
         layout.addWidget(self.frame_slider)
 
         # Current frame display
@@ -162,9 +269,29 @@ class DWFrameGalleryWidget(QWidget):
         self.save_thread = None
         self.original_frames_folder = "original_frames"
         self.annotated_frames_folder = "annotated_frames"
+        self._update_frame_path_prefix()
         self.feature_size = 15
         self.current_particles_in_frame = None
         self.video_loaded = False
+        # ((path, mtime, size), DataFrame) of filtered_particles.csv
+        self._filtered_particles_cache = None
+        # frame number -> row positions in the cached filtered particles, built on first use
+        self._particles_by_frame = None
+        # LRU of (frame path, mtime, reduction factor) -> decoded BGR frame
+        self._frame_cache = OrderedDict()
+        # LRU of (frame key, invert) -> annotation color picked for that decoded frame
+        self._annotation_colors = OrderedDict()
+        # Full-resolution (width, height) of the frames, learned from the first decoded frame
+        self._frame_size = None
+        # Reduction factor of the frame currently on screen
+        self._displayed_reduction = 1
+        # Slider moves are coalesced so at most one frame is rendered per ~60 Hz tick,
+        # always the latest one requested
+        self._pending_frame = None
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setSingleShot(True)
+        self._redraw_timer.setInterval(16)
+        self._redraw_timer.timeout.connect(self._flush_pending_frame)
 
     def save_video_frames(self, video_path):
         """Save video frames to disk in a background thread"""
@@ -172,6 +299,8 @@ class DWFrameGalleryWidget(QWidget):
         self.current_frame_idx = 0
         self.annotate_toggle.setChecked(False)
         self.video_loaded = True
+        # The new video may have a different resolution
+        self._frame_size = None
 
         self.save_thread = SaveFramesThread(video_path, self.original_frames_folder)
         self.save_thread.save_complete.connect(self.on_save_complete)
@@ -189,6 +318,7 @@ class DWFrameGalleryWidget(QWidget):
     def load_frames(self, num_frames):
         """Load existing frames."""
         self.total_frames = num_frames
+        self._frame_size = None
         if self.total_frames > 0:
             self.frame_slider.setRange(0, self.total_frames - 1)
             self.video_loaded = True
@@ -212,6 +342,47 @@ class DWFrameGalleryWidget(QWidget):
             # If the box was just unchecked, refresh the current frame
             self.display_frame(self.current_frame_idx)
 
+    def set_filtered_particles(self, filtered_particles):
+        """Adopt the filtering widget's in-memory result for the file it just wrote."""
+        if not self.file_controller:
+            return
+        signature = self.file_controller.get_data_file_signature("filtered_particles.csv")
+        self._filtered_particles_cache = (
+            (signature, filtered_particles) if signature is not None else None
+        )
+        self._particles_by_frame = None
+
+    def _load_filtered_particles(self):
+        """Return filtered particle data, re-reading the CSV only when it has changed."""
+        signature = self.file_controller.get_data_file_signature("filtered_particles.csv")
+        if (
+            signature is not None
+            and self._filtered_particles_cache
+            and self._filtered_particles_cache[0] == signature
+        ):
+            return self._filtered_particles_cache[1]
+        # A filter apply may be replacing the file on a worker thread. Its previous contents
+        # are still complete, and filteredDataUpdated / filteredParticlesUpdated bring in and
+        # redraw the new result when the apply finishes, so never block the GUI waiting for it
+        particle_data = self.file_controller.load_particles_data("filtered_particles.csv")
+        self._filtered_particles_cache = (
+            (signature, particle_data) if signature is not None else None
+        )
+        self._particles_by_frame = None
+        return particle_data
+
+    def _get_particles_in_frame(self, frame_number):
+        """Return the filtered particles in a frame via a frame index built once per load."""
+        particle_data = self._load_filtered_particles()
+        if particle_data.empty or "frame" not in particle_data.columns:
+            return _EMPTY_PARTICLES
+        if self._particles_by_frame is None:
+            self._particles_by_frame = particle_data.groupby("frame", sort=False).indices
+        positions = self._particles_by_frame.get(frame_number)
+        if positions is None:
+            return _EMPTY_PARTICLES
+        return particle_data.iloc[positions]
+
     def refresh_frame(self):
         """Force a refresh of the current frame."""
         self.display_frame(self.current_frame_idx)
@@ -226,15 +397,13 @@ class DWFrameGalleryWidget(QWidget):
         if self.file_controller:
             frames_folder = self.file_controller.original_frames_folder
 
-        frame_files = []
+        # Only the count is needed, so count matching names in one pass without sorting
+        total_frames = 0
         if frames_folder and os.path.exists(frames_folder):
-            frame_files = sorted(
-                f
-                for f in os.listdir(frames_folder)
-                if f.startswith("frame_") and f.lower().endswith(".jpg")
-            )
+            with os.scandir(frames_folder) as entries:
+                total_frames = sum(1 for entry in entries if FRAME_FILENAME_RE.fullmatch(entry.name))
 
-        self.total_frames = len(frame_files)
+        self.total_frames = total_frames
 
         if self.total_frames > 0:
             self.frame_slider.setRange(0, self.total_frames - 1)
@@ -252,6 +421,10 @@ class DWFrameGalleryWidget(QWidget):
         Loads the specified frame and overlays annotations and/or highlights
         based on the current state of the UI.
         """
+        # This frame supersedes any slider value still waiting to be drawn
+        self._pending_frame = None
+        self._redraw_timer.stop()
+
         if not (0 <= frame_number < self.total_frames):
             # if self.total_frames == 0:
             # self.frame_label.setText("No video loaded")
@@ -261,15 +434,17 @@ class DWFrameGalleryWidget(QWidget):
         self.current_frame_idx = frame_number
         # self.import_video_button.hide()
 
-        # Delete old annotated frames
-        if self.file_controller:
-            self.file_controller.delete_all_files_in_folder(self.annotated_frames_folder)
-
         # 1. Get original frame path
-        original_frame_path = os.path.join(
-            self.original_frames_folder, f"frame_{frame_number:05d}.jpg"
-        )
-        if not os.path.exists(original_frame_path):
+        original_frame_path = f"{self._frame_path_prefix}{frame_number:05d}.jpg"
+
+        # Decode no larger than the label shows; while the slider is dragged go one step
+        # smaller, and re-decode at display resolution once the slider is released
+        reduction = self._get_reduction_factor(self.frame_slider.isSliderDown())
+        self._displayed_reduction = reduction
+
+        # One stat both checks the frame exists and keys the decoded-frame caches
+        frame_key = self._frame_key(original_frame_path, reduction)
+        if frame_key is None:
             self.frame_label.clear()
             self.frame_label.setText(f"Frame not found")
             self.update_frame_display()
@@ -285,46 +460,48 @@ class DWFrameGalleryWidget(QWidget):
 
         # 3. Decide if annotation is needed
         needs_annotation = show_annotations or highlight_info is not None
-        pixmap_path = original_frame_path
+        pixmap = None
 
         if needs_annotation and self.file_controller:
-            # Load image with OpenCV for drawing
-            image_to_modify = cv2.imread(original_frame_path)
+            # Copy the decoded frame for drawing so the cached one stays clean
+            image_to_modify = self._read_frame(frame_key)
             if image_to_modify is None:
                 print(f"Warning: Failed to read frame for annotation: {original_frame_path}")
             else:
+                image_to_modify = image_to_modify.copy()
                 # Annotate with particle circles
                 if show_annotations:
-                    particle_data = self.file_controller.load_particles_data(
-                        "filtered_particles.csv"
-                    )
-                    if not particle_data.empty:
-                        particles_in_frame = particle_data[particle_data["frame"] == frame_number]
-                        if not particles_in_frame.empty:
-                            # Get invert setting and calculate optimal annotation color
-                            from ..utils.ParticleProcessing import (
-                                _get_invert_setting,
-                                calculate_optimal_annotation_color,
-                            )
-
-                            invert = _get_invert_setting()
+                    particles_in_frame = self._get_particles_in_frame(frame_number)
+                    self.current_particles_in_frame = particles_in_frame
+                    if not particles_in_frame.empty:
+                        # The color analysis makes several passes over the whole image,
+                        # so it is done once per decoded frame rather than on every redraw
+                        invert = _get_invert_setting()
+                        color_key = (frame_key, invert)
+                        annotation_color = self._annotation_colors.get(color_key)
+                        if annotation_color is None:
                             annotation_color = calculate_optimal_annotation_color(
                                 image_to_modify, invert
                             )
-
-                            for _, particle in particles_in_frame.iterrows():
-                                cv2.circle(
-                                    image_to_modify,
-                                    (int(particle["x"]), int(particle["y"])),
-                                    int(self.feature_size / 1.5),
-                                    annotation_color,
-                                    2,
-                                )
+                            self._annotation_colors[color_key] = annotation_color
+                            while len(self._annotation_colors) > _FRAME_CACHE_SIZE:
+                                self._annotation_colors.popitem(last=False)
+                        else:
+                            self._annotation_colors.move_to_end(color_key)
+
+                        # Truncate all centres to pixels at once rather than building a
+                        # Series per particle with iterrows
+                        xs = (particles_in_frame["x"].to_numpy() / reduction).astype(int).tolist()
+                        ys = (particles_in_frame["y"].to_numpy() / reduction).astype(int).tolist()
+                        radius = max(1, int(self.feature_size / 1.5 / reduction))
+                        for x, y in zip(xs, ys):
+                            cv2.circle(image_to_modify, (x, y), radius, annotation_color, 2)
 
                 # Annotate with highlight box
                 if highlight_info:
-                    x, y = int(highlight_info["x"]), int(highlight_info["y"])
-                    crop_radius = 25  # 50x50 box
+                    x = int(highlight_info["x"] / reduction)
+                    y = int(highlight_info["y"] / reduction)
+                    crop_radius = 25 // reduction  # 50x50 box at full resolution
                     cv2.rectangle(
                         image_to_modify,
                         (x - crop_radius, y - crop_radius),
@@ -333,26 +510,73 @@ class DWFrameGalleryWidget(QWidget):
                         3,
                     )
 
-                # Save the newly annotated frame
-                annotated_frame_path = os.path.join(
-                    self.annotated_frames_folder, f"frame_{frame_number:05d}.jpg"
-                )
-                self.file_controller.ensure_folder_exists(self.annotated_frames_folder)
-                cv2.imwrite(annotated_frame_path, image_to_modify)
-                pixmap_path = annotated_frame_path
+                # Display the annotated frame straight from memory
+                pixmap = self._to_pixmap(image_to_modify)
 
         # 4. Display the pixmap
-        pixmap = QPixmap(pixmap_path)
-        if pixmap.isNull():
-            print(f"Warning: Failed to load pixmap from {pixmap_path}")
-            # Fallback to original path if annotation saving failed
-            pixmap = QPixmap(original_frame_path)
+        if pixmap is None:
+            image = self._read_frame(frame_key)
+            if image is not None:
+                pixmap = self._to_pixmap(image)
+            else:
+                print(f"Warning: Failed to load pixmap from {original_frame_path}")
+                pixmap = QPixmap()
 
         self.frame_label.setPixmap(pixmap)
 
         self.update_frame_display()
         self.frame_changed.emit(frame_number)
 
+    def _get_reduction_factor(self, scrubbing=False):
+        """Return the largest decode reduction whose output still covers the frame label."""
+        if not self._frame_size:
+            return 1
+        # Compare in device pixels so HiDPI screens still get a full-detail frame
+        ratio = self.frame_label.devicePixelRatioF()
+        if scrubbing:
+            ratio /= 2
+        label_width = self.frame_label.width() * ratio
+        label_height = self.frame_label.height() * ratio
+        frame_width, frame_height = self._frame_size
+        for factor in _REDUCED_READ_FLAGS:
+            if label_width * factor <= frame_width and label_height * factor <= frame_height:
+                return factor
+        return 1
+
+    def _frame_key(self, frame_path, reduction=1):
+        """Return the cache key of a frame file, or None if it is missing."""
+        try:
+            return (frame_path, os.stat(frame_path).st_mtime_ns, reduction)
+        except OSError:
+            return None
+
+    def _read_frame(self, key):
+        """Return the decoded BGR frame for a frame key, reusing recently decoded frames."""
+        frame_path, _, reduction = key
+        image = self._frame_cache.get(key)
+        if image is not None:
+            self._frame_cache.move_to_end(key)
+            return image
+        # libjpeg scales in the DCT domain, so a reduced decode costs a fraction of a full one
+        image = cv2.imread(frame_path, _REDUCED_READ_FLAGS[reduction])
+        if image is None:
+            return None
+        if reduction == 1:
+            self._frame_size = (image.shape[1], image.shape[0])
+        self._frame_cache[key] = image
+        while len(self._frame_cache) > _FRAME_CACHE_SIZE:
+            self._frame_cache.popitem(last=False)
+        return image
+
+    def _to_pixmap(self, bgr_image):
+        """Convert a BGR image array into a QPixmap that owns its pixel data."""
+        # Wrap OpenCV's BGR bytes as they are, with no RGB conversion pass. QImage only
+        # borrows the array's memory, so bgr_image must stay alive until fromImage has
+        # copied it into the pixmap
+        height, width = bgr_image.shape[:2]
+        q_image = QImage(bgr_image.data, width, height, bgr_image.strides[0], QImage.Format_BGR888)
+        return QPixmap.fromImage(q_image)
+
     def update_frame_display(self):
         """Update the frame display and input"""
         if self.total_frames > 0:
@@ -387,6 +611,36 @@ class DWFrameGalleryWidget(QWidget):
 
     def slider_value_changed(self, value):
         """Go to frame specified by slider"""
+        if self.frame_slider.isSliderDown():
+            # Fast-scale frames while scrubbing; the label smooth-scales the last one
+            # once the slider settles
+            self.frame_label.begin_interaction()
+        # Always queue the latest value, even the frame on screen, so dragging away and
+        # back within one tick ends on the frame under the thumb
+        self._pending_frame = value
+        if not self._redraw_timer.isActive():
+            self._redraw_timer.start()
+
+    def slider_released(self):
+        """Redraw the current frame at display resolution once scrubbing ends."""
+        # A pending redraw of another frame will already decode at display resolution
+        if self._pending_frame not in (None, self.current_frame_idx):
+            return
+        if self._displayed_reduction != self._get_reduction_factor():
+            self.display_frame(self.current_frame_idx)
+
+    def resizeEvent(self, event):
+        """Re-decode the current frame when the label outgrows its decoded resolution."""
+        super().resizeEvent(event)
+        if self.total_frames > 0 and self._displayed_reduction > self._get_reduction_factor(
+            self.frame_slider.isSliderDown()
+        ):
+            self.display_frame(self.current_frame_idx)
+
+    def _flush_pending_frame(self):
+        """Render the latest frame requested by the slider."""
+        frame_number = self._pending_frame
+        self._pending_frame = None
         # prevent recursive calls if display_frame updates the slider
-        if value != self.current_frame_idx:
-            self.display_frame(value)
+        if frame_number is not None and frame_number != self.current_frame_idx:
+            self.display_frame(frame_number)
@@ -10,11 +10,16 @@ Date: 2025-12-08
 """
 
 import os
+import json
+import threading
+import operator
 import configparser
+import numpy as np
 import pandas as pd
-import uuid
-from dataclasses import dataclass
-from typing import List, Optional, Callable
+from secrets import token_hex
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Callable, Tuple
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -29,11 +34,36 @@ from PySide6.QtWidgets import (
     QFrame,
     QApplication,
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
 from PySide6.QtGui import QFont
 
 
-@dataclass
+# Comparison operators offered by the filter dialogs and the ufuncs they dispatch to
+FILTER_OPERATOR_FUNCTIONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+FILTER_OPERATORS = list(FILTER_OPERATOR_FUNCTIONS)
+
+# Compound filter operators and their DataFrame.eval equivalents. eval has no "^", so XOR
+# is written as inequality of the two boolean terms
+COMPOUND_EXPRESSION_OPERATORS = {"AND": "&", "OR": "|", "XOR": "!="}
+
+# Below this fraction of passing rows, filtered rows are gathered by position
+_TAKE_SELECTIVITY = 0.1
+
+# Rows read from the source file to infer which columns can be filtered on
+_PARAMETER_SAMPLE_ROWS = 256
+
+# Source files larger than this are filtered in chunks rather than parsed whole
+_STREAMING_APPLY_BYTES = 256 * 1024 * 1024
+
+
+@dataclass(slots=True, frozen=True)
 class Filter:
     """Data class representing a single filter."""
 
@@ -51,10 +81,11 @@ class Filter:
         None
         """
         if self.filter_id is None:
-            self.filter_id = str(uuid.uuid4())[:8]
+            # Frozen, so bypass __setattr__; 8 hex characters, like the old uuid prefix
+            object.__setattr__(self, "filter_id", token_hex(4))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CompoundFilter:
     """Data class representing a compound filter with two filters and an operator."""
 
@@ -72,7 +103,7 @@ class CompoundFilter:
         None
         """
         if self.filter_id is None:
-            self.filter_id = str(uuid.uuid4())[:8]
+            object.__setattr__(self, "filter_id", token_hex(4))
 
 
 class FilterCreatorDialog(QDialog):
@@ -111,7 +142,7 @@ class FilterCreatorDialog(QDialog):
         operator_layout = QHBoxLayout()
         operator_layout.addWidget(QLabel("Operator:"))
         self.operator_combo = QComboBox()
-        self.operator_combo.addItems(["<", "<=", ">", ">=", "==", "!="])
+        self.operator_combo.addItems(FILTER_OPERATORS)
         operator_layout.addWidget(self.operator_combo)
         layout.addLayout(operator_layout)
 
@@ -195,7 +226,7 @@ class CompoundFilterCreatorDialog(QDialog):
         operator1_layout = QHBoxLayout()
         operator1_layout.addWidget(QLabel("Operator:"))
         self.operator1_combo = QComboBox()
-        self.operator1_combo.addItems(["<", "<=", ">", ">=", "==", "!="])
+        self.operator1_combo.addItems(FILTER_OPERATORS)
         operator1_layout.addWidget(self.operator1_combo)
         layout.addLayout(operator1_layout)
 
@@ -236,7 +267,7 @@ class CompoundFilterCreatorDialog(QDialog):
         operator2_layout = QHBoxLayout()
         operator2_layout.addWidget(QLabel("Operator:"))
         self.operator2_combo = QComboBox()
-        self.operator2_combo.addItems(["<", "<=", ">", ">=", "==", "!="])
+        self.operator2_combo.addItems(FILTER_OPERATORS)
         operator2_layout.addWidget(self.operator2_combo)
         layout.addLayout(operator2_layout)
 
@@ -292,6 +323,15 @@ class CompoundFilterCreatorDialog(QDialog):
         self.accept()
 
 
+@lru_cache(maxsize=None)
+def _card_label_font() -> QFont:
+    """Return the bold font shared by every filter card label."""
+    # Created on first use, once a QApplication exists, rather than at import
+    label_font = QFont()
+    label_font.setBold(True)
+    return label_font
+
+
 class FilterCard(QFrame):
     """Widget representing a single filter card."""
 
@@ -320,9 +360,7 @@ class FilterCard(QFrame):
         layout.setContentsMargins(8, 4, 8, 4)
         filter_text = f"{filter_obj.parameter} {filter_obj.operator} {filter_obj.value}"
         label = QLabel(filter_text)
-        label_font = QFont()
-        label_font.setBold(True)
-        label.setFont(label_font)
+        label.setFont(_card_label_font())
         layout.addWidget(label)
         delete_button = QPushButton("×")
         delete_button.setFixedSize(24, 24)
@@ -360,9 +398,7 @@ class CompoundFilterCard(QFrame):
         f2 = compound_filter_obj.filter2
         filter_text = f"({f1.parameter} {f1.operator} {f1.value}) {compound_filter_obj.operator} ({f2.parameter} {f2.operator} {f2.value})"
         label = QLabel(filter_text)
-        label_font = QFont()
-        label_font.setBold(True)
-        label.setFont(label_font)
+        label.setFont(_card_label_font())
         layout.addWidget(label)
         delete_button = QPushButton("×")
         delete_button.setFixedSize(24, 24)
@@ -370,10 +406,38 @@ class CompoundFilterCard(QFrame):
         layout.addWidget(delete_button)
 
 
+class FilterApplyThread(QThread):
+    """Thread for filtering the source data and writing the output file."""
+
+    # filter generation, original count, filtered count, filtered data (None if never loaded)
+    filters_applied = Signal(int, int, int, object)
+
+    def __init__(self, apply_function, generation, filters, compound_filters, parent=None):
+        """Initialize with the apply function and a snapshot of the filters."""
+        super().__init__(parent)
+        self.apply_function = apply_function
+        self.generation = generation
+        self.filters = filters
+        self.compound_filters = compound_filters
+
+    def run(self):
+        """Filter and save; emits nothing if a newer generation superseded this one."""
+        try:
+            result = self.apply_function(self.generation, self.filters, self.compound_filters)
+        except Exception as e:
+            print(f"Error applying filters: {e}")
+            return
+        if result is not None:
+            self.filters_applied.emit(self.generation, *result)
+
+
 class DWLWFilteringWidget(QWidget):
     """Widget for managing particle data filters."""
 
     filteredParticlesUpdated = Signal()
+    # Emitted just before filteredParticlesUpdated with the filtered DataFrame that was
+    # written, so listeners can use it without re-reading the file. Treat it as read-only
+    filteredDataUpdated = Signal(object)
 
     def __init__(self, source_data_file: str = "all_particles.csv", parent=None):
         """
@@ -396,6 +460,23 @@ class DWLWFilteringWidget(QWidget):
         self.compound_filters: List[CompoundFilter] = []
         self.file_controller = None
         self.source_data_file = source_data_file
+        # ((path, mtime, size), DataFrame, float32 comparison DataFrame, numeric column
+        # names) of the last parsed source file
+        self._source_cache = None
+        # ((path, mtime, size), numeric column names) sampled from the head of the source file
+        self._numeric_columns_cache = None
+        # ((path, mtime, size), row count, column bounds) of the last chunked pass over a
+        # source too large to load; see _update_column_bounds
+        self._source_bounds = None
+        # (apply key, original count, filtered count, filtered DataFrame or None) of the last
+        # apply that wrote output
+        self._last_apply = None
+        # Filters compare against float32 copies of float columns unless this is set, for
+        # thresholds that need more than float32's ~7 significant digits. Read from the
+        # [Filtering] high_precision config option; see the high_precision_filters property
+        self._high_precision_filters = False
+        # filter_id -> (filter object, card widget) for the cards currently shown
+        self._cards_by_id = {}
         self.available_parameters = [
             "mass",
             "size",
@@ -407,6 +488,17 @@ class DWLWFilteringWidget(QWidget):
             "raw_mass",
             "ep",
         ]
+        # Filter edits made in quick succession are saved and applied once, when they settle
+        self._filter_update_timer = QTimer(self)
+        self._filter_update_timer.setSingleShot(True)
+        self._filter_update_timer.setInterval(150)
+        self._filter_update_timer.timeout.connect(self._commit_filter_changes)
+        # Filtering and writing the output run on FilterApplyThreads. The generation is
+        # bumped for every apply so superseded threads skip their work and results; the
+        # lock keeps one apply at a time touching the source cache and output file
+        self._filter_generation = 0
+        self._filter_threads = []
+        self._apply_lock = threading.Lock()
         self.setup_ui()
 
     def set_file_controller(self, file_controller):
@@ -425,9 +517,47 @@ class DWLWFilteringWidget(QWidget):
         self.file_controller = file_controller
         if file_controller:
             self.project_path = file_controller.project_path
+            config_manager = getattr(file_controller, "config_manager", None)
+            if config_manager:
+                self._high_precision_filters = (
+                    config_manager.get("Filtering", "high_precision", "false").lower() == "true"
+                )
             self.load_filters_from_disk()
             self.update_available_parameters()
 
+    @property
+    def high_precision_filters(self) -> bool:
+        """Whether filters compare float columns at full float64 precision."""
+        return self._high_precision_filters
+
+    @high_precision_filters.setter
+    def high_precision_filters(self, enabled: bool):
+        """
+        Choose between float32 and exact float64 filter comparisons.
+
+        The choice is saved to the project config and the filters are re-applied.
+
+        Parameters
+        ----------
+        enabled : bool
+            True to compare float columns at full float64 precision.
+
+        Returns
+        -------
+        None
+        """
+        enabled = bool(enabled)
+        if enabled == self._high_precision_filters:
+            return
+        self._high_precision_filters = enabled
+        if not self.file_controller:
+            return
+        config_manager = getattr(self.file_controller, "config_manager", None)
+        if config_manager:
+            config_manager.set("Filtering", "high_precision", "true" if enabled else "false")
+            config_manager.save()
+        self._schedule_filter_update()
+
     def set_source_data_file(self, filename: str):
         """
         Set the source data file to filter (e.g., 'all_particles.csv').
@@ -510,6 +640,47 @@ class DWLWFilteringWidget(QWidget):
         self.particle_labels_layout.addWidget(self.particles_after_filter_label)
         layout.addWidget(self.particle_labels)
 
+    def _load_source_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+        """
+        Load the source data file, reusing the last parse while the file is unchanged.
+
+        Returns
+        -------
+        Tuple[pd.DataFrame, pd.DataFrame, List[str]]
+            Source data (empty if the file doesn't exist), the same data with float64
+            columns stored as float32 and integer columns downcast for filter comparisons,
+            and its numeric column names.
+        """
+        signature = self.file_controller.get_data_file_signature(self.source_data_file)
+        # Read the cache once; a FilterApplyThread may replace it concurrently
+        source_cache = self._source_cache
+        if signature is not None and source_cache and source_cache[0] == signature:
+            return source_cache[1], source_cache[2], source_cache[3]
+
+        # Use source_data_file to determine which file to load
+        # For trajectories, use load_trajectories_data, for particles use load_particles_data
+        if self.source_data_file == "trajectories.csv":
+            data = self.file_controller.load_trajectories_data(self.source_data_file)
+        else:
+            data = self.file_controller.load_particles_data(self.source_data_file)
+        # Filters compare against float32 copies of the float columns, halving the bytes
+        # each comparison reads. Thresholds are typed to far fewer digits than float32
+        # keeps, and the saved output is still selected from the float64 data
+        float_columns = data.select_dtypes(include=["float64"]).columns
+        comparison_data = data.astype({column: np.float32 for column in float_columns})
+        # Integer columns such as frame and particle hold small values, so the comparison
+        # copy stores them in the narrowest integer dtype that fits, losslessly. The data
+        # that is written and emitted keeps its original dtypes, so listeners doing
+        # arithmetic on these columns can't overflow
+        for column in data.select_dtypes(include=["integer"]).columns:
+            comparison_data[column] = pd.to_numeric(data[column], downcast="integer")
+        # Dialogs list these on every open, so resolve them once per parse
+        numeric_columns = data.select_dtypes(include=["number"]).columns.tolist()
+        self._source_cache = (
+            (signature, data, comparison_data, numeric_columns) if signature is not None else None
+        )
+        return data, comparison_data, numeric_columns
+
     def update_available_parameters(self):
         """
         Update the list of available parameters from the data file.
@@ -521,20 +692,11 @@ class DWLWFilteringWidget(QWidget):
         if not self.file_controller:
             return
         try:
-            # Use source_data_file to determine which file to load
-            if self.source_data_file == "trajectories.csv":
-                data = self.file_controller.load_trajectories_data(self.source_data_file)
-            else:
-                data = self.file_controller.load_particles_data(self.source_data_file)
-
-            if not data.empty:
-                numeric_cols = data.select_dtypes(include=["number"]).columns.tolist()
-                if numeric_cols:
-                    self.available_parameters = numeric_cols
-                else:
-                    self.available_parameters = []  # No numeric columns found
+            numeric_cols = self._get_numeric_columns()
+            if numeric_cols:
+                self.available_parameters = list(numeric_cols)
             else:
-                self.available_parameters = []  # Empty DataFrame
+                self.available_parameters = []  # Empty DataFrame or no numeric columns found
         except pd.errors.EmptyDataError:
             self.available_parameters = []  # Handle empty file
             print(
@@ -543,6 +705,33 @@ class DWLWFilteringWidget(QWidget):
         except Exception as e:
             print(f"Error updating available parameters: {e}")
 
+    def _get_numeric_columns(self) -> List[str]:
+        """
+        Get the numeric column names of the source data file without parsing all of it.
+
+        Returns
+        -------
+        List[str]
+            Numeric column names, or an empty list if the file is missing or has no rows.
+        """
+        signature = self.file_controller.get_data_file_signature(self.source_data_file)
+        if signature is None:
+            return []
+        # Reuse a full parse of the unchanged file if one is cached, otherwise infer the
+        # dtypes from the first rows only
+        source_cache = self._source_cache
+        if source_cache and source_cache[0] == signature:
+            return source_cache[3] if not source_cache[1].empty else []
+        numeric_columns_cache = self._numeric_columns_cache
+        if numeric_columns_cache and numeric_columns_cache[0] == signature:
+            return numeric_columns_cache[1]
+        head = pd.read_csv(signature[0], nrows=_PARAMETER_SAMPLE_ROWS)
+        numeric_columns = (
+            head.select_dtypes(include=["number"]).columns.tolist() if not head.empty else []
+        )
+        self._numeric_columns_cache = (signature, numeric_columns)
+        return numeric_columns
+
     def open_filter_creator(self):
         """
         Open the filter creator dialog.
@@ -598,8 +787,7 @@ class DWLWFilteringWidget(QWidget):
         """
         self.filters.append(filter_obj)
         self.update_filter_cards_ui()
-        self.save_filters_to_disk()
-        self.apply_filters_and_notify()
+        self._schedule_filter_update()
 
     def add_compound_filter(self, compound_filter_obj: CompoundFilter):
         """
@@ -616,8 +804,7 @@ class DWLWFilteringWidget(QWidget):
         """
         self.compound_filters.append(compound_filter_obj)
         self.update_filter_cards_ui()
-        self.save_filters_to_disk()
-        self.apply_filters_and_notify()
+        self._schedule_filter_update()
 
     def remove_filter(self, filter_id: str):
         """
@@ -634,8 +821,7 @@ class DWLWFilteringWidget(QWidget):
         """
         self.filters = [f for f in self.filters if f.filter_id != filter_id]
         self.update_filter_cards_ui()
-        self.save_filters_to_disk()
-        self.apply_filters_and_notify()
+        self._schedule_filter_update()
 
     def remove_compound_filter(self, filter_id: str):
         """
@@ -652,8 +838,7 @@ class DWLWFilteringWidget(QWidget):
         """
         self.compound_filters = [f for f in self.compound_filters if f.filter_id != filter_id]
         self.update_filter_cards_ui()
-        self.save_filters_to_disk()
-        self.apply_filters_and_notify()
+        self._schedule_filter_update()
 
     def update_filter_cards_ui(self):
         """
@@ -663,24 +848,50 @@ class DWLWFilteringWidget(QWidget):
         -------
         None
         """
-        while self.cards_layout.count() > 1:
-            item = self.cards_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        for filter_obj in self.filters:
-            card = FilterCard(filter_obj, self.remove_filter, self)
-            self.cards_layout.insertWidget(self.cards_layout.count() - 1, card)
-        for compound_filter_obj in self.compound_filters:
-            card = CompoundFilterCard(compound_filter_obj, self.remove_compound_filter, self)
-            self.cards_layout.insertWidget(self.cards_layout.count() - 1, card)
+        # Only cards whose filter was added, removed or changed are created or destroyed.
+        # Cards are matched by filter_id and value, so reloading unchanged filters from
+        # disk keeps every card
+        wanted = [(filter_obj, FilterCard, self.remove_filter) for filter_obj in self.filters]
+        wanted += [
+            (compound_filter_obj, CompoundFilterCard, self.remove_compound_filter)
+            for compound_filter_obj in self.compound_filters
+        ]
+        wanted_objects = {filter_obj.filter_id: filter_obj for filter_obj, _, _ in wanted}
+        for filter_id, (filter_obj, card) in list(self._cards_by_id.items()):
+            wanted_obj = wanted_objects.get(filter_id)
+            if wanted_obj is None or wanted_obj != filter_obj:
+                del self._cards_by_id[filter_id]
+                self.cards_layout.removeWidget(card)
+                card.deleteLater()
+            elif wanted_obj is not filter_obj:
+                self._cards_by_id[filter_id] = (wanted_obj, card)
+
+        for position, (filter_obj, card_class, on_delete) in enumerate(wanted):
+            if filter_obj.filter_id not in self._cards_by_id:
+                card = card_class(filter_obj, on_delete, self)
+                self._cards_by_id[filter_obj.filter_id] = (filter_obj, card)
+                self.cards_layout.insertWidget(position, card)
         total_filters = len(self.filters) + len(self.compound_filters)
         self.status_label.setText(
             f"{total_filters} filter(s) active" if total_filters > 0 else "No filters active"
         )
 
+    def get_filters_json_path(self) -> str:
+        """
+        Get the path to the filters.json file in the project root.
+
+        Returns
+        -------
+        str
+            Path to the filters.json file, or None if no project path is set.
+        """
+        if not self.project_path:
+            return None
+        return os.path.join(self.project_path, "filters.json")
+
     def get_filters_ini_path(self) -> str:
         """
-        Get the path to the filters.ini file in the project root.
+        Get the path to the legacy filters.ini file in the project root.
 
         Returns
         -------
@@ -693,100 +904,204 @@ class DWLWFilteringWidget(QWidget):
 
     def save_filters_to_disk(self):
         """
-        Save filters to disk in filters.ini file.
+        Save filters to disk in filters.json file.
 
         Returns
         -------
         None
         """
-        ini_path = self.get_filters_ini_path()
-        if not ini_path:
+        json_path = self.get_filters_json_path()
+        if not json_path:
             return
-        config = configparser.ConfigParser()
-        # Create sections for filters and compound filters
-        config["filters"] = {}
-        for filter_obj in self.filters:
-            # Storing as a list of strings, e.g., "mass,>,100.0"
-            value_str = f"{filter_obj.parameter},{filter_obj.operator},{filter_obj.value}"
-            config["filters"][filter_obj.filter_id] = value_str
-
-        config["compound_filters"] = {}
-        for compound_filter_obj in self.compound_filters:
-            f1 = compound_filter_obj.filter1
-            f2 = compound_filter_obj.filter2
-            # Store as: "param1,op1,val1|param2,op2,val2|operator"
-            value_str = f"{f1.parameter},{f1.operator},{f1.value}|{f2.parameter},{f2.operator},{f2.value}|{compound_filter_obj.operator}"
-            config["compound_filters"][compound_filter_obj.filter_id] = value_str
-
+        payload = {
+            "filters": [asdict(filter_obj) for filter_obj in self.filters],
+            "compound_filters": [
+                asdict(compound_filter_obj) for compound_filter_obj in self.compound_filters
+            ],
+        }
+
+        # Write to a temporary file and swap it in so a failed write never leaves a
+        # truncated filters file behind
+        tmp_path = json_path + ".tmp"
         try:
-            with open(ini_path, "w") as f:
-                config.write(f)
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f, indent=4)
+            os.replace(tmp_path, json_path)
         except Exception as e:
             print(f"Error saving filters to disk: {e}")
 
     def load_filters_from_disk(self):
         """
-        Load filters from disk from filters.ini file.
+        Load filters from disk from filters.json, migrating a legacy filters.ini if needed.
 
         Returns
         -------
         None
         """
+        json_path = self.get_filters_json_path()
         ini_path = self.get_filters_ini_path()
-        if not ini_path or not os.path.exists(ini_path):
-            self.filters = []
-            self.compound_filters = []
-            self.update_filter_cards_ui()
-            self.apply_filters_and_notify()  # Apply filters after loading (even if empty)
-            return
-
-        config = configparser.ConfigParser()
+        self.filters = []
+        self.compound_filters = []
         try:
-            config.read(ini_path)
-            self.filters = []
-            self.compound_filters = []
-
-            if "filters" in config:
-                for filter_id, value_str in config["filters"].items():
-                    parts = value_str.split(",")
-                    if len(parts) == 3:
-                        param, op, val = parts
-                        filter_obj = Filter(
-                            parameter=param, operator=op, value=float(val), filter_id=filter_id
+            if json_path and os.path.exists(json_path):
+                with open(json_path, "r") as f:
+                    payload = json.load(f)
+                for filter_data in payload.get("filters", []):
+                    self.filters.append(Filter(**filter_data))
+                for compound_data in payload.get("compound_filters", []):
+                    self.compound_filters.append(
+                        CompoundFilter(
+                            filter1=Filter(**compound_data["filter1"]),
+                            filter2=Filter(**compound_data["filter2"]),
+                            operator=compound_data["operator"],
+                            filter_id=compound_data.get("filter_id"),
                         )
-                        self.filters.append(filter_obj)
-
-            if "compound_filters" in config:
-                for compound_filter_id, value_str in config["compound_filters"].items():
-                    parts = value_str.split("|")
-                    if len(parts) == 3:
-                        filter1_str, filter2_str, compound_op = parts
-                        f1_parts = filter1_str.split(",")
-                        f2_parts = filter2_str.split(",")
-                        if len(f1_parts) == 3 and len(f2_parts) == 3:
-                            f1 = Filter(
-                                parameter=f1_parts[0],
-                                operator=f1_parts[1],
-                                value=float(f1_parts[2]),
-                            )
-                            f2 = Filter(
-                                parameter=f2_parts[0],
-                                operator=f2_parts[1],
-                                value=float(f2_parts[2]),
-                            )
-                            compound_filter_obj = CompoundFilter(
-                                filter1=f1,
-                                filter2=f2,
-                                operator=compound_op,
-                                filter_id=compound_filter_id,
-                            )
-                            self.compound_filters.append(compound_filter_obj)
-
-            self.update_filter_cards_ui()
-            self.apply_filters_and_notify()  # Apply filters after loading
+                    )
+            elif ini_path and os.path.exists(ini_path):
+                self._load_legacy_ini_filters(ini_path)
+                self.save_filters_to_disk()
         except Exception as e:
             print(f"Error loading filters from disk: {e}")
 
+        self.update_filter_cards_ui()
+        self.apply_filters_and_notify()  # Apply filters after loading (even if empty)
+
+    def _load_legacy_ini_filters(self, ini_path: str):
+        """
+        Read filters from a filters.ini file written by older versions.
+
+        Parameters
+        ----------
+        ini_path : str
+            Path to the filters.ini file.
+
+        Returns
+        -------
+        None
+        """
+        config = configparser.ConfigParser()
+        config.read(ini_path)
+
+        if "filters" in config:
+            for filter_id, value_str in config["filters"].items():
+                parts = value_str.split(",")
+                if len(parts) == 3:
+                    param, op, val = parts
+                    filter_obj = Filter(
+                        parameter=param, operator=op, value=float(val), filter_id=filter_id
+                    )
+                    self.filters.append(filter_obj)
+
+        if "compound_filters" in config:
+            for compound_filter_id, value_str in config["compound_filters"].items():
+                parts = value_str.split("|")
+                if len(parts) == 3:
+                    filter1_str, filter2_str, compound_op = parts
+                    f1_parts = filter1_str.split(",")
+                    f2_parts = filter2_str.split(",")
+                    if len(f1_parts) == 3 and len(f2_parts) == 3:
+                        f1 = Filter(
+                            parameter=f1_parts[0],
+                            operator=f1_parts[1],
+                            value=float(f1_parts[2]),
+                        )
+                        f2 = Filter(
+                            parameter=f2_parts[0],
+                            operator=f2_parts[1],
+                            value=float(f2_parts[2]),
+                        )
+                        compound_filter_obj = CompoundFilter(
+                            filter1=f1,
+                            filter2=f2,
+                            operator=compound_op,
+                            filter_id=compound_filter_id,
+                        )
+                        self.compound_filters.append(compound_filter_obj)
+
+    def _schedule_filter_update(self):
+        """
+        Save and apply the filters once edits stop arriving.
+
+        Returns
+        -------
+        None
+        """
+        self._filter_update_timer.start()
+
+    def _commit_filter_changes(self):
+        """
+        Save the filters to disk, then apply them on a worker thread and notify listeners.
+
+        Returns
+        -------
+        None
+        """
+        self.save_filters_to_disk()
+        if not self.file_controller:
+            print("File controller not set")
+            return
+        self._filter_generation += 1
+        # Snapshot the lists so later edits on the GUI thread don't race with the worker
+        thread = FilterApplyThread(
+            self._apply_filters_to_file,
+            self._filter_generation,
+            tuple(self.filters),
+            tuple(self.compound_filters),
+            self,
+        )
+        thread.filters_applied.connect(self._on_filters_applied)
+        # Parented to the widget so Qt owns it; released once done. Windows join running
+        # applies with wait_for_pending_filters before closing
+        thread.finished.connect(lambda: self._filter_threads.remove(thread))
+        thread.finished.connect(thread.deleteLater)
+        self._filter_threads.append(thread)
+        thread.start()
+
+    def wait_for_pending_filters(self):
+        """
+        Apply any debounced filter edits and block until the filtered output is written.
+
+        This blocks the calling thread for the whole filter-and-write, so only use it on
+        explicit steps that must act on the finished output, such as linking. Displays
+        should follow filteredDataUpdated / filteredParticlesUpdated instead.
+
+        Returns
+        -------
+        None
+        """
+        if self._filter_update_timer.isActive():
+            self._filter_update_timer.stop()
+            self._commit_filter_changes()
+        for thread in list(self._filter_threads):
+            thread.wait()
+
+    def _on_filters_applied(self, generation, original_count, filtered_count, filtered_data):
+        """
+        Show the counts from a finished background apply and notify listeners.
+
+        Parameters
+        ----------
+        generation : int
+            Filter generation the thread applied.
+        original_count : int
+            Number of particles before filtering.
+        filtered_count : int
+            Number of particles after filtering.
+        filtered_data : Optional[pd.DataFrame]
+            The filtered data that was written, or None if it was filtered in chunks
+            without being loaded.
+
+        Returns
+        -------
+        None
+        """
+        if generation != self._filter_generation:
+            return  # A newer apply has been started since
+        self.update_particle_labels(original_count, filtered_count)
+        if filtered_data is not None:
+            self.filteredDataUpdated.emit(filtered_data)
+        self.filteredParticlesUpdated.emit()
+
     def apply_filters_and_notify(self):
         """
         Apply filters and notify listeners of the update.
@@ -795,7 +1110,14 @@ class DWLWFilteringWidget(QWidget):
         -------
         None
         """
-        self.apply_filters()
+        if self._filter_update_timer.isActive():
+            # Fold pending filter edits into this apply rather than applying them again
+            # when the debounce fires
+            self._filter_update_timer.stop()
+            self.save_filters_to_disk()
+        filtered_data = self.apply_filters()
+        if filtered_data is not None:
+            self.filteredDataUpdated.emit(filtered_data)
         self.filteredParticlesUpdated.emit()
 
     def update_particle_labels(self, all_particle_count, filtered_particle_count):
@@ -825,45 +1147,206 @@ class DWLWFilteringWidget(QWidget):
         Returns
         -------
         Optional[pd.DataFrame]
-            Filtered DataFrame, or None if file_controller is not set.
+            Filtered DataFrame, or None if file_controller is not set or the source was
+            filtered in chunks without being loaded.
         """
         if not self.file_controller:
             print("File controller not set")
             return None
-        # Use source_data_file to determine which file to load
-        # For trajectories, use load_trajectories_data, for particles use load_particles_data
+        # Supersede any background apply so its results are not shown after these
+        self._filter_generation += 1
+        original_count, filtered_count, filtered_data = self._apply_filters_to_file(
+            self._filter_generation, self.filters, self.compound_filters
+        )
+        self.update_particle_labels(original_count, filtered_count)
+        return filtered_data
+
+    def _apply_filters_to_file(self, generation, filters, compound_filters):
+        """
+        Filter the source data and write the output file. Safe to call from a worker thread.
+
+        Parameters
+        ----------
+        generation : int
+            Filter generation being applied.
+        filters : Sequence[Filter]
+            Simple filters to apply.
+        compound_filters : Sequence[CompoundFilter]
+            Compound filters to apply.
+
+        Returns
+        -------
+        Optional[Tuple[int, int, Optional[pd.DataFrame]]]
+            Original and filtered row counts and the filtered DataFrame (None if the source
+            was filtered in chunks), or None if a newer generation was started before this
+            one got to run.
+        """
+        with self._apply_lock:
+            if generation != self._filter_generation:
+                return None
+            return self._apply_filters_locked(filters, compound_filters)
+
+    def _apply_filters_locked(self, filters, compound_filters):
+        """Filter and save with the apply lock held; see _apply_filters_to_file."""
         if self.source_data_file == "trajectories.csv":
-            data = self.file_controller.load_trajectories_data(self.source_data_file)
             output_filename = "trajectories.csv"
         else:
             # Default to particles
-            data = self.file_controller.load_particles_data(self.source_data_file)
             output_filename = "filtered_particles.csv"
 
-        if data.empty:
-            filtered_data = pd.DataFrame()
-        else:
-            filtered_data = apply_filters(data, self.filters, self.compound_filters)
-
-        # Use FileController to save filtered data
-        if self.source_data_file == "trajectories.csv":
-            output_path = self.file_controller.save_trajectories_data(
-                filtered_data, output_filename
+        # Nothing to do if the same filters were last applied to these exact source and
+        # output files, e.g. on startup or after an edit is reverted
+        apply_key = self._get_apply_key(filters, compound_filters, output_filename)
+        last_apply = self._last_apply
+        if apply_key is not None and last_apply is not None and last_apply[0] == apply_key:
+            return last_apply[1:]
+
+        source_signature = self.file_controller.get_data_file_signature(self.source_data_file)
+        source_cache = self._source_cache
+        if (
+            source_signature is not None
+            and source_signature[2] > _STREAMING_APPLY_BYTES
+            and not (source_cache and source_cache[0] == source_signature)
+        ):
+            # Too large to parse whole: filter and write one chunk at a time instead
+            output_path, original_count, filtered_count = self._apply_filters_in_chunks(
+                filters, compound_filters, source_signature, output_filename
             )
+            filtered_data = None
         else:
-            output_path = self.file_controller.save_filtered_particles_data(
-                filtered_data, output_filename
-            )
+            data, comparison_data, _ = self._load_source_frames()
+
+            if data.empty:
+                filtered_data = pd.DataFrame()
+            else:
+                filtered_data = apply_filters(
+                    data,
+                    list(filters),
+                    list(compound_filters),
+                    None if self.high_precision_filters else comparison_data,
+                )
+
+            # Use FileController to save filtered data
+            if not data.empty and len(filtered_data) == len(data):
+                # Every row passed, so the output is exactly the source file; copy its bytes
+                # instead of formatting every value back to text
+                output_path = self.file_controller.copy_data_file(
+                    self.source_data_file, output_filename
+                )
+            elif self.source_data_file == "trajectories.csv":
+                output_path = self.file_controller.save_trajectories_data(
+                    filtered_data, output_filename
+                )
+            else:
+                output_path = self.file_controller.save_filtered_particles_data(
+                    filtered_data, output_filename
+                )
+
+            original_count = len(data) if not data.empty else 0
+            filtered_count = len(filtered_data)
 
-        original_count = len(data) if not data.empty else 0
         print(f"Saved filtered data to: {output_path}")
         print(f"  Original: {original_count} particles")
-        print(f"  Filtered: {len(filtered_data)} particles")
-        self.update_particle_labels(original_count, len(filtered_data))
-        return filtered_data
+        print(f"  Filtered: {filtered_count} particles")
+        # Key on the files as written; for trajectories the output replaces the source
+        self._last_apply = (
+            self._get_apply_key(filters, compound_filters, output_filename),
+            original_count,
+            filtered_count,
+            filtered_data,
+        )
+        return original_count, filtered_count, filtered_data
+
+    def _apply_filters_in_chunks(
+        self, filters, compound_filters, source_signature, output_filename
+    ) -> Tuple[str, int, int]:
+        """
+        Filter a source file too large to load and write the output, one chunk at a time.
+
+        Parameters
+        ----------
+        filters : Sequence[Filter]
+            Simple filters to apply.
+        compound_filters : Sequence[CompoundFilter]
+            Compound filters to apply.
+        source_signature : tuple
+            Signature of the source file being filtered.
+        output_filename : str
+            Name of the file the filtered data is written to.
+
+        Returns
+        -------
+        Tuple[str, int, int]
+            Path to the written file, and the row counts before and after filtering.
+        """
+        # Column bounds gathered on an earlier pass over this exact file can prove that
+        # every row passes; the source is then copied as is, without parsing it again
+        source_bounds = self._source_bounds
+        if source_bounds is not None and source_bounds[0] == source_signature:
+            row_count, column_bounds = source_bounds[1], source_bounds[2]
+            if _filters_keep_all_rows(filters, compound_filters, column_bounds):
+                output_path = self.file_controller.copy_data_file(
+                    self.source_data_file, output_filename
+                )
+                return output_path, row_count, row_count
+
+        column_bounds = {}
+
+        def filter_chunk(chunk):
+            _update_column_bounds(column_bounds, chunk)
+            return apply_filters(chunk, list(filters), list(compound_filters))
 
+        output_path, row_count, kept_count = self.file_controller.filter_data_file_in_chunks(
+            self.source_data_file, output_filename, filter_chunk
+        )
+        self._source_bounds = (source_signature, row_count, column_bounds)
+        return output_path, row_count, kept_count
+
+    def _get_apply_key(self, filters, compound_filters, output_filename):
+        """
+        Identify an apply by the filter values, the comparison precision and the current
+        source and output files.
 
-def apply_single_filter(df: pd.DataFrame, filter_obj: Filter) -> pd.Series:
+        Parameters
+        ----------
+        filters : Sequence[Filter]
+            Simple filters being applied.
+        compound_filters : Sequence[CompoundFilter]
+            Compound filters being applied.
+        output_filename : str
+            Name of the file the filtered data is written to.
+
+        Returns
+        -------
+        Optional[tuple]
+            Hashable key, or None if either file is missing.
+        """
+        source_signature = self.file_controller.get_data_file_signature(self.source_data_file)
+        output_signature = self.file_controller.get_data_file_signature(output_filename)
+        if source_signature is None or output_signature is None:
+            return None
+        return (
+            source_signature,
+            output_signature,
+            tuple(_filter_key(filter_obj) for filter_obj in filters),
+            tuple(
+                (
+                    _filter_key(compound_filter_obj.filter1),
+                    compound_filter_obj.operator,
+                    _filter_key(compound_filter_obj.filter2),
+                )
+                for compound_filter_obj in compound_filters
+            ),
+            self.high_precision_filters,
+        )
+
+
+def apply_single_filter(
+    df: pd.DataFrame,
+    filter_obj: Filter,
+    rows: Optional[np.ndarray] = None,
+    columns: Optional[Dict[str, np.ndarray]] = None,
+) -> np.ndarray:
     """
     Apply a single filter and return a boolean mask.
 
@@ -873,41 +1356,45 @@ def apply_single_filter(df: pd.DataFrame, filter_obj: Filter) -> pd.Series:
         DataFrame to filter.
     filter_obj : Filter
         Filter object containing parameter, operator, and value.
+    rows : np.ndarray, optional
+        Row positions to evaluate. If None, all rows are evaluated.
+    columns : Dict[str, np.ndarray], optional
+        Column arrays already extracted from df, keyed by name.
 
     Returns
     -------
-    pd.Series
-        Boolean mask indicating which rows pass the filter.
+    np.ndarray
+        Boolean mask indicating which of the evaluated rows pass the filter.
     """
     parameter = filter_obj.parameter
     operator = filter_obj.operator
     value = filter_obj.value
+    row_count = len(df) if rows is None else len(rows)
     if parameter not in df.columns:
         print(f"Warning: Parameter '{parameter}' not found in data. Skipping filter.")
-        return pd.Series([False] * len(df), index=df.index)
+        return np.zeros(row_count, dtype=bool)
+    # Compare the raw column array so no index-aligned Series is built per filter
+    column = columns[parameter] if columns and parameter in columns else df[parameter].to_numpy()
+    if rows is not None:
+        column = column[rows]
+    if column.dtype == np.float32:
+        value = np.float32(value)  # Compare in float32 rather than upcasting the column
+    compare = FILTER_OPERATOR_FUNCTIONS.get(operator)
+    if compare is None:
+        print(f"Warning: Unknown operator '{operator}'. Skipping filter.")
+        return np.zeros(row_count, dtype=bool)
     try:
-        if operator == "<":
-            return df[parameter] < value
-        elif operator == "<=":
-            return df[parameter] <= value
-        elif operator == ">":
-            return df[parameter] > value
-        elif operator == ">=":
-            return df[parameter] >= value
-        elif operator == "==":
-            return df[parameter] == value
-        elif operator == "!=":
-            return df[parameter] != value
-        else:
-            print(f"Warning: Unknown operator '{operator}'. Skipping filter.")
-            return pd.Series([False] * len(df), index=df.index)
+        return compare(column, value)
     except Exception as e:
         print(f"Error applying filter {parameter} {operator} {value}: {e}")
-        return pd.Series([False] * len(df), index=df.index)
+        return np.zeros(row_count, dtype=bool)
 
 
 def apply_filters(
-    df: pd.DataFrame, filters: List[Filter], compound_filters: List[CompoundFilter] = None
+    df: pd.DataFrame,
+    filters: List[Filter],
+    compound_filters: List[CompoundFilter] = None,
+    comparison_df: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     """
     Apply a list of filters and compound filters to a DataFrame.
@@ -920,39 +1407,365 @@ def apply_filters(
         List of simple filters (all are ANDed together).
     compound_filters : List[CompoundFilter], optional
         List of compound filters. Each is applied independently and ANDed with previous results.
+    comparison_df : pd.DataFrame, optional
+        Row-aligned copy of `df` (e.g. with narrower dtypes) to evaluate the filters on.
+        Rows are still selected from `df`. Defaults to `df` itself.
 
     Returns
     -------
     pd.DataFrame
-        Filtered DataFrame.
+        Filtered DataFrame. When there are no filters this is `df` itself, not a copy.
     """
     if not filters and (not compound_filters or len(compound_filters) == 0):
-        return df.copy()
-    filtered_df = df.copy()
+        # Nothing to filter; callers only read the result, so skip copying every column
+        return df
+
+    # Build the mask with one fused expression (numexpr when installed); fall back to
+    # per-filter masks if a filter cannot be expressed or the expression fails
+    if comparison_df is None:
+        comparison_df = df
+    filters = _coalesce_filters(filters)
+    expression = build_filter_expression(comparison_df, filters, compound_filters)
+    if expression is not None:
+        try:
+            return _apply_mask(df, comparison_df.eval(expression).to_numpy(dtype=bool))
+        except Exception as e:
+            print(f"Error evaluating filter expression '{expression}': {e}")
+
+    # The per-filter path already yields the passing row positions, in order; gather them
+    # once instead of round-tripping through a mask
+    return df.take(combined_filter_rows(comparison_df, filters, compound_filters))
+
+
+def _coalesce_filters(filters: List[Filter]) -> List[Filter]:
+    """
+    Drop simple filters made redundant by a tighter bound on the same parameter.
+
+    Parameters
+    ----------
+    filters : List[Filter]
+        Simple filters, all ANDed together.
+
+    Returns
+    -------
+    List[Filter]
+        The filters with at most one lower and one upper bound per parameter, in their
+        original order. Equality filters, non-numeric or non-finite values and unknown
+        operators are kept as they are.
+    """
+
+    def is_bound(filter_obj):
+        return (
+            filter_obj.operator in (">", ">=", "<", "<=")
+            and isinstance(filter_obj.value, (int, float))
+            and np.isfinite(filter_obj.value)
+        )
+
+    # parameter -> tightest (lower, upper) bound filter seen so far
+    tightest = {}
+    for filter_obj in filters:
+        if is_bound(filter_obj):
+            lower, upper = tightest.get(filter_obj.parameter, (None, None))
+            if filter_obj.operator[0] == ">":
+                # A larger value, or a strict bound at the same value, is tighter
+                if lower is None or (filter_obj.value, filter_obj.operator == ">") > (
+                    lower.value,
+                    lower.operator == ">",
+                ):
+                    lower = filter_obj
+            elif upper is None or (-filter_obj.value, filter_obj.operator == "<") > (
+                -upper.value,
+                upper.operator == "<",
+            ):
+                upper = filter_obj
+            tightest[filter_obj.parameter] = (lower, upper)
+
+    kept = {id(bound) for bounds in tightest.values() for bound in bounds if bound is not None}
+    return [filter_obj for filter_obj in filters if id(filter_obj) in kept or not is_bound(filter_obj)]
+
+
+def _apply_mask(df: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    """
+    Select the rows of a DataFrame where a boolean mask is True.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame to select from.
+    mask : np.ndarray
+        Boolean mask with one entry per row.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected rows.
+    """
+    positions = np.flatnonzero(mask)
+    # When few rows pass, gathering them by position is cheaper than boolean indexing,
+    # which walks the whole mask again for every column
+    if len(positions) < len(mask) * _TAKE_SELECTIVITY:
+        return df.take(positions)
+    return df[mask]
+
+
+def combined_filter_mask(
+    df: pd.DataFrame, filters: List[Filter], compound_filters: List[CompoundFilter] = None
+) -> np.ndarray:
+    """
+    Build the boolean mask of rows passing every filter and compound filter.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame to filter.
+    filters : List[Filter]
+        List of simple filters (all are ANDed together).
+    compound_filters : List[CompoundFilter], optional
+        List of compound filters, each ANDed with the simple filters.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask indicating which rows pass all filters.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    mask[combined_filter_rows(df, filters, compound_filters)] = True
+    return mask
+
+
+def combined_filter_rows(
+    df: pd.DataFrame, filters: List[Filter], compound_filters: List[CompoundFilter] = None
+) -> np.ndarray:
+    """
+    Find the positions of the rows passing every filter and compound filter.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame to filter.
+    filters : List[Filter]
+        List of simple filters (all are ANDed together).
+    compound_filters : List[CompoundFilter], optional
+        List of compound filters, each ANDed with the simple filters.
 
-    # Apply simple filters (all are ANDed together)
+    Returns
+    -------
+    np.ndarray
+        Ascending positions of the rows that pass all filters.
+    """
+    # Extract every referenced column once instead of indexing the DataFrame per filter
+    parameters = {filter_obj.parameter for filter_obj in filters}
+    for compound_filter_obj in compound_filters or []:
+        parameters.add(compound_filter_obj.filter1.parameter)
+        parameters.add(compound_filter_obj.filter2.parameter)
+    columns = {name: df[name].to_numpy() for name in parameters if name in df.columns}
+
+    # Positions of the rows still passing. Each filter only evaluates these, so filters
+    # after a selective one touch fewer values
+    rows = np.arange(len(df))
+
+    # Apply simple filters (all are ANDed together). Once no rows are left, no later
+    # filter can bring any back
     for filter_obj in filters:
-        mask = apply_single_filter(filtered_df, filter_obj)
-        filtered_df = filtered_df[mask]
+        rows = rows[apply_single_filter(df, filter_obj, rows, columns)]
+        if len(rows) == 0:
+            return rows
 
     # Apply compound filters (each compound filter is applied independently, ANDed with previous results)
     if compound_filters:
         for compound_filter_obj in compound_filters:
-            mask1 = apply_single_filter(filtered_df, compound_filter_obj.filter1)
-            mask2 = apply_single_filter(filtered_df, compound_filter_obj.filter2)
+            if compound_filter_obj.operator not in ("AND", "OR", "XOR"):
+                print(
+                    f"Warning: Unknown compound operator '{compound_filter_obj.operator}'. Skipping compound filter."
+                )
+                continue
 
+            mask1 = apply_single_filter(df, compound_filter_obj.filter1, rows, columns)
             if compound_filter_obj.operator == "AND":
-                combined_mask = mask1 & mask2
+                # Filter 2 only needs to decide rows that passed filter 1
+                rows = rows[mask1]
+                rows = rows[apply_single_filter(df, compound_filter_obj.filter2, rows, columns)]
             elif compound_filter_obj.operator == "OR":
-                combined_mask = mask1 | mask2
-            elif compound_filter_obj.operator == "XOR":
-                combined_mask = mask1 ^ mask2
-            else:
-                print(
-                    f"Warning: Unknown compound operator '{compound_filter_obj.operator}'. Skipping compound filter."
+                # Filter 2 only needs to decide rows that failed filter 1
+                combined_mask = mask1.copy()
+                combined_mask[~mask1] = apply_single_filter(
+                    df, compound_filter_obj.filter2, rows[~mask1], columns
                 )
+                rows = rows[combined_mask]
+            else:
+                mask2 = apply_single_filter(df, compound_filter_obj.filter2, rows, columns)
+                rows = rows[mask1 ^ mask2]
+            if len(rows) == 0:
+                break
+
+    return rows
+
+
+def build_filter_expression(
+    df: pd.DataFrame, filters: List[Filter], compound_filters: List[CompoundFilter] = None
+) -> Optional[str]:
+    """
+    Build a single DataFrame.eval expression equivalent to applying all filters.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame the expression will be evaluated against.
+    filters : List[Filter]
+        List of simple filters (all are ANDed together).
+    compound_filters : List[CompoundFilter], optional
+        List of compound filters, each ANDed with the simple filters.
+
+    Returns
+    -------
+    Optional[str]
+        The expression, or None if any filter references a missing column or uses an
+        unknown operator (those are handled with warnings by the per-filter path).
+    """
+
+    def filter_term(filter_obj):
+        if filter_obj.parameter not in df.columns or filter_obj.operator not in FILTER_OPERATORS:
+            return None
+        if "`" in filter_obj.parameter:
+            return None  # Can't be backtick-quoted, so it could break out of the expression
+        try:
+            value = float(filter_obj.value)
+        except (TypeError, ValueError):
+            return None
+        if not np.isfinite(value):
+            return None  # inf/nan have no literal form in an expression
+        # Backticks allow any other column name; repr of a float is always a plain numeric
+        # literal and keeps the full precision
+        return f"(`{filter_obj.parameter}` {filter_obj.operator} {value!r})"
+
+    terms = []
+    for filter_obj in filters:
+        term = filter_term(filter_obj)
+        if term is None:
+            return None
+        terms.append(term)
+
+    for compound_filter_obj in compound_filters or []:
+        compound_operator = COMPOUND_EXPRESSION_OPERATORS.get(compound_filter_obj.operator)
+        term1 = filter_term(compound_filter_obj.filter1)
+        term2 = filter_term(compound_filter_obj.filter2)
+        if compound_operator is None or term1 is None or term2 is None:
+            return None
+        terms.append(f"({term1} {compound_operator} {term2})")
+
+    return " & ".join(terms)
+
+
+def _update_column_bounds(bounds: Dict[str, Optional[tuple]], chunk: pd.DataFrame) -> None:
+    """
+    Fold a chunk's per-column minimum, maximum and NaN presence into running bounds.
+
+    Parameters
+    ----------
+    bounds : Dict[str, Optional[tuple]]
+        Column name -> (minimum, maximum, whether any value is NaN), or None for columns
+        that were not numeric in every chunk. Updated in place.
+    chunk : pd.DataFrame
+        Next chunk of rows.
+
+    Returns
+    -------
+    None
+    """
+    numeric = chunk.select_dtypes(include=["number"])
+    for column in chunk.columns.difference(numeric.columns):
+        bounds[column] = None
+    minimums = numeric.min()
+    maximums = numeric.max()
+    has_nans = numeric.isna().any()
+    for column in numeric.columns:
+        low, high, has_nan = minimums[column], maximums[column], bool(has_nans[column])
+        if column in bounds:
+            previous = bounds[column]
+            if previous is None:
                 continue
+            # fmin/fmax skip the NaN minimum of a chunk that is all NaN
+            low = np.fmin(low, previous[0])
+            high = np.fmax(high, previous[1])
+            has_nan = has_nan or previous[2]
+        bounds[column] = (low, high, has_nan)
+
+
+def _filter_keeps_all_rows(filter_obj: Filter, bounds: Dict[str, Optional[tuple]]) -> bool:
+    """
+    Check whether a column's bounds prove that every row passes a filter.
+
+    Parameters
+    ----------
+    filter_obj : Filter
+        Filter to check.
+    bounds : Dict[str, Optional[tuple]]
+        Column bounds as built by _update_column_bounds.
+
+    Returns
+    -------
+    bool
+        True only if no row can fail the filter.
+    """
+    column_bounds = bounds.get(filter_obj.parameter)
+    # NaN fails every comparison but !=; treat any NaN as unknown
+    if column_bounds is None or column_bounds[2]:
+        return False
+    low, high, _ = column_bounds
+    try:
+        value = float(filter_obj.value)
+    except (TypeError, ValueError):
+        return False
+    if filter_obj.operator in (">", ">="):
+        return bool(FILTER_OPERATOR_FUNCTIONS[filter_obj.operator](low, value))
+    if filter_obj.operator in ("<", "<="):
+        return bool(FILTER_OPERATOR_FUNCTIONS[filter_obj.operator](high, value))
+    if filter_obj.operator == "==":
+        return bool(low == value and high == value)
+    if filter_obj.operator == "!=":
+        return bool(value < low or value > high)
+    return False
+
+
+def _filters_keep_all_rows(
+    filters: List[Filter],
+    compound_filters: List[CompoundFilter],
+    bounds: Dict[str, Optional[tuple]],
+) -> bool:
+    """
+    Check whether column bounds prove that every row passes all filters.
+
+    Parameters
+    ----------
+    filters : List[Filter]
+        Simple filters (ANDed together).
+    compound_filters : List[CompoundFilter]
+        Compound filters (ANDed with the simple filters).
+    bounds : Dict[str, Optional[tuple]]
+        Column bounds as built by _update_column_bounds.
+
+    Returns
+    -------
+    bool
+        True only if no row can be filtered out.
+    """
+    if not all(_filter_keeps_all_rows(filter_obj, bounds) for filter_obj in filters):
+        return False
+    for compound_filter_obj in compound_filters:
+        first = _filter_keeps_all_rows(compound_filter_obj.filter1, bounds)
+        second = _filter_keeps_all_rows(compound_filter_obj.filter2, bounds)
+        if compound_filter_obj.operator == "AND":
+            keeps_all = first and second
+        elif compound_filter_obj.operator == "OR":
+            keeps_all = first or second
+        else:
+            # XOR of two filters every row passes keeps no rows
+            keeps_all = False
+        if not keeps_all:
+            return False
+    return True
 
-            filtered_df = filtered_df[combined_mask]
 
-    return filtered_df
+def _filter_key(filter_obj: Filter) -> tuple:
+    """Return the parts of a filter that affect its result, ignoring its id."""
+    return (filter_obj.parameter, filter_obj.operator, filter_obj.value)
@@ -429,4 +429,6 @@ class DWParametersWidget(QWidget):
     def next_step(self):
         self.save_params()
         self.graphing_panel.blank_plot
+        # Linking reads filtered_particles.csv, so let pending filter edits finish writing it
+        self.graphing_panel.filtering_widget.wait_for_pending_filters()
         self.openTrajectoryLinking.emit()
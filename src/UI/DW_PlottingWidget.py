@@ -32,6 +32,7 @@ from ..utils import GraphingUtils
 from .DW_LW_FilteringWidget import DWLWFilteringWidget
 import trackpy as tp
 import cv2
+import numpy as np
 import pandas as pd
 
 
@@ -98,8 +99,13 @@ class DWPlottingWidget(GraphingUtils.GraphingPanelWidget):
 
         self.layout.addWidget(self.graphing_buttons)
 
+        # Cached numpy views of the histogram columns, rebuilt whenever self.data changes
+        self._mass_arr = None
+        self._ecc_arr = None
+
         # Add filtering widget below the graphs
         self.filtering_widget = DWLWFilteringWidget(source_data_file="all_particles.csv")
+        self.filtering_widget.filteredParticlesUpdated.connect(self._invalidate_column_arrays)
         self.layout.addWidget(self.filtering_widget)
 
         # Add stretch below the buttons
@@ -108,6 +114,7 @@ class DWPlottingWidget(GraphingUtils.GraphingPanelWidget):
     def set_particles(self, particles):
         """Sets paritcle data and plots subpixel bias."""
         self.data = particles
+        self._update_column_arrays()
         self.self_plot(self.get_subpixel_bias, self.sb_button)
 
     def set_file_controller(self, file_controller):
@@ -127,6 +134,23 @@ class DWPlottingWidget(GraphingUtils.GraphingPanelWidget):
                 self.data = self.file_controller.load_particles_data("all_particles.csv")
             except (pd.errors.EmptyDataError, FileNotFoundError):
                 self.data = pd.DataFrame()
+            self._update_column_arrays()
+
+    def _update_column_arrays(self):
+        """Cache float64 numpy arrays of the histogram columns from self.data."""
+        self._mass_arr = None
+        self._ecc_arr = None
+        if self.data is None or self.data.empty:
+            return
+        if "mass" in self.data.columns:
+            self._mass_arr = self.data["mass"].to_numpy(dtype=np.float64, copy=False)
+        if "ecc" in self.data.columns:
+            self._ecc_arr = self.data["ecc"].to_numpy(dtype=np.float64, copy=False)
+
+    def _invalidate_column_arrays(self):
+        """Drop the cached column arrays so they are rebuilt on the next plot."""
+        self._mass_arr = None
+        self._ecc_arr = None
 
     def update_bins(self, value):
         self.bins = value
@@ -137,9 +161,12 @@ class DWPlottingWidget(GraphingUtils.GraphingPanelWidget):
             # Check if particles were found before plotting
             self.check_for_empty_data()
 
+            if self._mass_arr is None:
+                self._update_column_arrays()
+
             # Create the plot
             fig, ax = plt.subplots()
-            ax.hist(self.data["mass"], bins=self.bins)
+            ax.hist(self._mass_arr, bins=self.bins)
 
             # Label the axes
             ax.set_xlabel("Mass")
@@ -161,9 +188,12 @@ class DWPlottingWidget(GraphingUtils.GraphingPanelWidget):
             # Check if particles were found before plotting
             self.check_for_empty_data()
 
+            if self._ecc_arr is None:
+                self._update_column_arrays()
+
             # Create the plot
             fig, ax = plt.subplots()
-            ax.hist(self.data["ecc"], bins=self.bins)
+            ax.hist(self._ecc_arr, bins=self.bins)
 
             # Label the axes
             ax.set_xlabel("Eccentricity")
@@ -20,16 +20,42 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QSlider,
 )
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
 from PySide6.QtGui import QPixmap, QImage
 import cv2
 import numpy as np
 import os
 import json
+import threading
+from collections import OrderedDict
 
 from ..utils.ScaledLabel import ScaledLabel
 from ..utils.ParticleProcessing import create_rb_overlay_image
 
+# Side length of the square crop centred on each link
+_CROP_SIZE = 200
+
+
+class RBOverlayThread(QThread):
+    """Thread for building red-blue overlay images off the GUI thread."""
+
+    overlay_ready = Signal(int, int, int, object)  # links generation, index, threshold, RGB array
+
+    def __init__(self, build_overlay, generation, requests, parent=None):
+        """Initialize with the overlay builder and (link index, threshold, geometry) requests."""
+        super().__init__(parent)
+        self.build_overlay = build_overlay
+        self.generation = generation
+        self.requests = requests
+
+    def run(self):
+        """Build each overlay array; QPixmap conversion is left to the GUI thread."""
+        for index, threshold, geometry in self.requests:
+            if self.isInterruptionRequested():
+                return
+            rb_image = self.build_overlay(geometry, threshold)
+            self.overlay_ready.emit(self.generation, index, threshold, rb_image)
+
 
 class LWErrantDistanceLinksWidget(QWidget):
     def __init__(self, parent=None):
@@ -62,6 +88,12 @@ class LWErrantDistanceLinksWidget(QWidget):
         self.threshold_layout.addWidget(self.threshold_slider)
         self.layout.addLayout(self.threshold_layout)
 
+        # Coalesce slider drags so only the settled value regenerates the overlay
+        self._threshold_timer = QTimer(self)
+        self._threshold_timer.setSingleShot(True)
+        self._threshold_timer.setInterval(40)
+        self._threshold_timer.timeout.connect(lambda: self._display_link(self.curr_link_idx))
+
         # Navigation controls
         self.nav_layout = QHBoxLayout()
         self.prev_button = QPushButton("◀")
@@ -81,7 +113,23 @@ class LWErrantDistanceLinksWidget(QWidget):
 
         # This list will hold the metadata for the links to be displayed
         self.rb_links = []
+        # (path, mtime, size, frames folder) of the rb_links.json behind self.rb_links
+        self._rb_links_signature = None
         self.current_pixmap = None
+        # Generated overlays keyed by (link index, threshold), least recently used first
+        self._pixmap_cache = OrderedDict()
+        self._pixmap_cache_size = 128
+        # Decoded source frames keyed by path, least recently used first; overlays are built
+        # on worker threads, so access is guarded by a lock
+        self._frame_cache = OrderedDict()
+        self._frame_cache_size = 8
+        self._frame_cache_lock = threading.Lock()
+        # Bumped whenever the links change so results from older overlay threads are dropped
+        self._links_generation = 0
+        self._pending_overlays = set()
+        self._overlay_threads = []
+        # Frame paths and crop placement per link index, parsed from the metadata once
+        self._geometry_cache = {}
         self.original_frames_folder = None
 
         # Show initial trajectory if available
@@ -113,7 +161,7 @@ class LWErrantDistanceLinksWidget(QWidget):
 
         # Reload gallery files if path is set
         if self.errant_distance_links_dir:
-            self.rb_links = self._load_rb_links(self.errant_distance_links_dir)
+            self._set_rb_links(self._load_rb_links(self.errant_distance_links_dir))
             self.curr_link_idx = (
                 min(
                     self.curr_link_idx,
@@ -125,32 +173,64 @@ class LWErrantDistanceLinksWidget(QWidget):
             self._display_link(self.curr_link_idx)
 
     def _load_rb_links(self, directory_path):
-        """Return a sorted list of RB overlay image file paths."""
+        """Return the RB link metadata, reusing the loaded list if rb_links.json is unchanged."""
         metadata_path = os.path.join(directory_path, "rb_links.json")
-        if not os.path.exists(metadata_path):
+        try:
+            stat = os.stat(metadata_path)
+        except OSError:
+            self._rb_links_signature = None
             return []
+
+        # The frames folder is part of the signature because cached crops are read from it
+        signature = (metadata_path, stat.st_mtime_ns, stat.st_size, self.original_frames_folder)
+        if signature == self._rb_links_signature:
+            return self.rb_links
+
         try:
             with open(metadata_path, "r") as f:
-                return json.load(f)
+                rb_links = json.load(f)
         except (IOError, json.JSONDecodeError) as e:
             print(f"Error loading RB links metadata: {e}")
+            self._rb_links_signature = None
             return []
+        self._rb_links_signature = signature
+        return rb_links
+
+    def _set_rb_links(self, rb_links):
+        """Replace the link metadata and drop overlays generated for the old links."""
+        if rb_links is self.rb_links:
+            return
+        self.rb_links = rb_links
+        # Overlays for the old links would be dropped anyway, so stop building them
+        self.stop_overlay_threads(wait=False)
+        self._links_generation += 1
+        self._pending_overlays.clear()
+        self._pixmap_cache.clear()
+        with self._frame_cache_lock:
+            self._frame_cache.clear()
+        self._geometry_cache.clear()
 
     def _display_link(self, index):
         """Update UI to display RB overlay image and index if within bounds."""
         if 0 <= index < len(self.rb_links):
             link_info = self.rb_links[index]
 
-            # Regenerate image with current threshold
-            self.current_pixmap = self._generate_image_for_link(link_info)
-
-            # Scale to fit while keeping aspect ratio
-            if self.current_pixmap is not None:
-                self.photo_label.setPixmap(self.current_pixmap)
+            # Show the overlay for the current threshold if it was already generated;
+            # otherwise build it in the background and show it when ready
+            threshold = self.threshold_slider.value()
+            requests = []
+            pixmap = self._get_cached_pixmap(index, threshold)
+            if pixmap is not None:
+                self._show_pixmap(pixmap)
             else:
-                self.photo_label.setText("Failed to generate RB overlay image")
-                self._update_display_text()
-                return
+                requests.append((index, threshold))
+
+            # Build the neighboring links after it so next/prev display instantly
+            for neighbor in (index + 1, index - 1):
+                key = (neighbor, threshold)
+                if 0 <= neighbor < len(self.rb_links) and key not in self._pixmap_cache:
+                    requests.append(key)
+            self._request_overlays(requests)
 
             # Populate info text from metadata
             # Get scaling to convert pixels to microns
@@ -242,9 +322,9 @@ Search Range: {search_range_microns:.2f} μm"""
         self._update_errant_distance_links_path()
         # Reload files
         if self.errant_distance_links_dir:
-            self.rb_links = self._load_rb_links(self.errant_distance_links_dir)
+            self._set_rb_links(self._load_rb_links(self.errant_distance_links_dir))
         else:
-            self.rb_links = []
+            self._set_rb_links([])
         # Clamp current index within bounds
         if self.rb_links:
             self.curr_link_idx = min(self.curr_link_idx, len(self.rb_links) - 1)
@@ -255,8 +335,14 @@ Search Range: {search_range_microns:.2f} μm"""
     def _on_threshold_changed(self, value):
         """Handle threshold slider change - regenerate current image."""
         self.threshold_label.setText(f"Threshold: {value}%")
-        # Regenerate current image with new threshold
-        self._display_link(self.curr_link_idx)
+        # Scale with fast transformation while the slider is moving
+        self.photo_label.begin_interaction()
+        # Cached overlays can be shown right away; anything else waits for the drag to settle
+        if (self.curr_link_idx, value) in self._pixmap_cache:
+            self._threshold_timer.stop()
+            self._display_link(self.curr_link_idx)
+        else:
+            self._threshold_timer.start()
 
     def reset_state(self):
         """Reload gallery files when returning to the linking screen."""
@@ -264,53 +350,170 @@ Search Range: {search_range_microns:.2f} μm"""
         self._update_errant_distance_links_path()
         self._display_link(self.curr_link_idx)
 
-    def _generate_image_for_link(self, link_info):
-        """Generate RB overlay image for the given link metadata."""
+    def _get_cached_pixmap(self, index, threshold):
+        """Return the generated overlay for a link and threshold, or None if not built yet."""
+        key = (index, threshold)
+        pixmap = self._pixmap_cache.get(key)
+        if pixmap is not None:
+            self._pixmap_cache.move_to_end(key)
+        return pixmap
+
+    def _show_pixmap(self, pixmap):
+        """Display an overlay pixmap, scaled to fit while keeping aspect ratio."""
+        # Redisplaying the overlay already on screen would only throw away the label's scaled copy
+        if pixmap is self.current_pixmap:
+            return
+        self.current_pixmap = pixmap
+        self.photo_label.setPixmap(pixmap)
+
+    def _request_overlays(self, requests):
+        """Build the given (link index, threshold) overlays in a background thread."""
+        requests = [key for key in requests if key not in self._pending_overlays]
+        if not requests:
+            return
+        self._pending_overlays.update(requests)
+
+        # Link geometry is resolved here so the worker never reads self.rb_links
+        jobs = [(index, threshold, self._get_link_geometry(index)) for index, threshold in requests]
+        thread = RBOverlayThread(self._build_rb_array, self._links_generation, jobs, self)
+        thread.overlay_ready.connect(self._on_overlay_ready)
+        thread.finished.connect(lambda: self._overlay_threads.remove(thread))
+        thread.finished.connect(thread.deleteLater)
+        self._overlay_threads.append(thread)
+        thread.start()
+
+    def stop_overlay_threads(self, wait=True):
+        """Ask running overlay threads to stop, and by default wait for them to exit."""
+        for thread in list(self._overlay_threads):
+            if not thread.isInterruptionRequested():
+                thread.requestInterruption()
+                # Stop delivering overlays into a gallery that has moved on or is closing
+                thread.overlay_ready.disconnect(self._on_overlay_ready)
+            if wait:
+                thread.wait()
+        self._pending_overlays.clear()
+
+    def _on_overlay_ready(self, generation, index, threshold, rb_image):
+        """Cache a finished overlay and display it if it is still the one being viewed."""
+        if generation != self._links_generation:
+            return
+        key = (index, threshold)
+        self._pending_overlays.discard(key)
+
+        pixmap = self._to_pixmap(rb_image) if rb_image is not None else None
+        if pixmap is not None:
+            self._pixmap_cache[key] = pixmap
+            if len(self._pixmap_cache) > self._pixmap_cache_size:
+                self._pixmap_cache.popitem(last=False)
+
+        if key != (self.curr_link_idx, self.threshold_slider.value()):
+            return
+        if pixmap is not None:
+            self._show_pixmap(pixmap)
+        else:
+            self.current_pixmap = None
+            self.photo_label.setPixmap(QPixmap())
+            self.photo_label.setText("Failed to generate RB overlay image")
+
+    def _get_frame(self, frame_path):
+        """Return the decoded grayscale frame at frame_path, reading it from disk only once."""
+        with self._frame_cache_lock:
+            frame = self._frame_cache.get(frame_path)
+            if frame is not None:
+                self._frame_cache.move_to_end(frame_path)
+                return frame
+
+        if not os.path.exists(frame_path):
+            return None
+        # The overlay only thresholds brightness, so skip decoding the color channels
+        frame = cv2.imread(frame_path, cv2.IMREAD_GRAYSCALE)
+        if frame is not None:
+            with self._frame_cache_lock:
+                self._frame_cache[frame_path] = frame
+                if len(self._frame_cache) > self._frame_cache_size:
+                    self._frame_cache.popitem(last=False)
+        return frame
+
+    def _to_pixmap(self, rb_image):
+        """Convert an RGB overlay array into a QPixmap that owns its pixel data."""
+        # QImage only wraps the array's memory, so keep a contiguous buffer alive until
+        # fromImage has copied it into the pixmap
+        buffer = np.ascontiguousarray(rb_image)
+        height, width = buffer.shape[:2]
+        q_image = QImage(buffer.data, width, height, 3 * width, QImage.Format_RGB888)
+        return QPixmap.fromImage(q_image)
+
+    def _get_link_geometry(self, index):
+        """Return frame paths, crop origin and relative positions for a link, parsing it once."""
         if not self.original_frames_folder:
             return None
-
+        if index in self._geometry_cache:
+            return self._geometry_cache[index]
+
+        link_info = self.rb_links[index]
+        values = [
+            link_info.get(key) for key in ("frame_i", "frame_i1", "x_i", "y_i", "x_i1", "y_i1")
+        ]
+        geometry = None
         try:
-            frame_i = link_info.get("frame_i")
-            frame_i1 = link_info.get("frame_i1")
-            x_i = link_info.get("x_i")
-            y_i = link_info.get("y_i")
-            x_i1 = link_info.get("x_i1")
-            y_i1 = link_info.get("y_i1")
-
-            if any(v is None for v in [frame_i, frame_i1, x_i, y_i, x_i1, y_i1]):
-                return None
-
-            frame1_filename = os.path.join(self.original_frames_folder, f"frame_{frame_i:05d}.jpg")
-            frame2_filename = os.path.join(self.original_frames_folder, f"frame_{frame_i1:05d}.jpg")
+            if all(v is not None for v in values):
+                frame_i, frame_i1, x_i, y_i, x_i1, y_i1 = values
+                crop_radius = _CROP_SIZE // 2
+
+                # Calculate midpoint and single crop origin
+                mid_x = (x_i + x_i1) / 2
+                mid_y = (y_i + y_i1) / 2
+                crop_origin_x = int(mid_x - crop_radius)
+                crop_origin_y = int(mid_y - crop_radius)
+
+                geometry = (
+                    os.path.join(self.original_frames_folder, f"frame_{frame_i:05d}.jpg"),
+                    os.path.join(self.original_frames_folder, f"frame_{frame_i1:05d}.jpg"),
+                    crop_origin_x,
+                    crop_origin_y,
+                    # Relative positions in the unified crop
+                    (
+                        x_i - crop_origin_x,
+                        y_i - crop_origin_y,
+                        x_i1 - crop_origin_x,
+                        y_i1 - crop_origin_y,
+                    ),
+                )
+        except (TypeError, ValueError) as e:
+            print(f"Error reading link metadata: {e}")
+        self._geometry_cache[index] = geometry
+        return geometry
+
+    def _build_rb_array(self, geometry, threshold_percent):
+        """Build the RGB overlay array for a link; runs on a worker thread, so no Qt calls."""
+        if geometry is None:
+            return None
 
-            if not os.path.exists(frame1_filename) or not os.path.exists(frame2_filename):
-                return None
+        try:
+            frame1_filename, frame2_filename, crop_origin_x, crop_origin_y, positions = geometry
 
-            full_frame1 = cv2.imread(frame1_filename)
-            full_frame2 = cv2.imread(frame2_filename)
+            full_frame1 = self._get_frame(frame1_filename)
+            full_frame2 = self._get_frame(frame2_filename)
 
             if full_frame1 is None or full_frame2 is None:
                 return None
 
-            threshold_percent = self.threshold_slider.value()
-            crop_size = 200
-            crop_radius = crop_size // 2
-
-            # Calculate midpoint and single crop origin
-            mid_x = (x_i + x_i1) / 2
-            mid_y = (y_i + y_i1) / 2
-            crop_origin_x = int(mid_x - crop_radius)
-            crop_origin_y = int(mid_y - crop_radius)
+            crop_size = _CROP_SIZE
 
             # Function to create padded crops
             def create_padded_crop(full_frame):
-                canvas = np.zeros((crop_size, crop_size, 3), dtype=np.uint8)
-
                 src_x_start = max(0, crop_origin_x)
                 src_y_start = max(0, crop_origin_y)
                 src_x_end = min(full_frame.shape[1], crop_origin_x + crop_size)
                 src_y_end = min(full_frame.shape[0], crop_origin_y + crop_size)
 
+                # A crop that lies fully inside the frame needs no padding; thresholding only
+                # reads it, so a view of the cached frame avoids copying it into a canvas
+                if src_x_end - src_x_start == crop_size and src_y_end - src_y_start == crop_size:
+                    return full_frame[src_y_start:src_y_end, src_x_start:src_x_end]
+
+                canvas = np.zeros((crop_size, crop_size) + full_frame.shape[2:], dtype=np.uint8)
+
                 dest_x_start = max(0, -crop_origin_x)
                 dest_y_start = max(0, -crop_origin_y)
                 dest_x_end = dest_x_start + (src_x_end - src_x_start)
@@ -324,31 +527,14 @@ Search Range: {search_range_microns:.2f} μm"""
             padded_crop1 = create_padded_crop(full_frame1)
             padded_crop2 = create_padded_crop(full_frame2)
 
-            rb_image = create_rb_overlay_image(
+            return create_rb_overlay_image(
                 padded_crop1,
                 padded_crop2,
-                x_i - crop_origin_x,  # Relative positions in the new unified crop
-                y_i - crop_origin_y,
-                x_i1 - crop_origin_x,
-                y_i1 - crop_origin_y,
+                *positions,
                 threshold_percent=threshold_percent,
                 crop_size=crop_size,
             )
 
-            if rb_image is not None:
-                height, width, channel = rb_image.shape
-                bytes_per_line = 3 * width
-                q_image = QPixmap.fromImage(
-                    QImage(
-                        rb_image.data,
-                        width,
-                        height,
-                        bytes_per_line,
-                        QImage.Format_RGB888,
-                    )
-                )
-                return q_image
-
         except Exception as e:
             print(f"Error generating image for link: {e}")
 
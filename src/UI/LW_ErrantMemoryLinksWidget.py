@@ -20,8 +20,12 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap
 import os
+import re
 import json
 
+# Cropped memory link frames are named "frame_#####.jpg"
+_LINK_FRAME_RE = re.compile(r"frame_(\d+)\.jpg", re.IGNORECASE)
+
 
 class LWErrantMemoryLinksWidget(QWidget):
     """Widget for displaying memory link galleries."""
@@ -139,6 +143,7 @@ class LWErrantMemoryLinksWidget(QWidget):
         self.current_link_idx = 0
         self.current_frame_idx = 0
         self.current_link_frames = []  # List of frame files for current link
+        self.current_link_frame_numbers = {}  # Original frame number for each frame file
 
     def set_config_manager(self, config_manager):
         self.config_manager = config_manager
@@ -193,11 +198,17 @@ class LWErrantMemoryLinksWidget(QWidget):
 
         link_folder_path = os.path.join(self.errant_memory_links_folder, link_folder_name)
 
-        frame_files = [
-            os.path.join(link_folder_path, f)
-            for f in sorted(os.listdir(link_folder_path))
-            if f.startswith("frame_") and f.lower().endswith(".jpg")
-        ]
+        frame_files = []
+        self.current_link_frame_numbers = {}
+        for f in sorted(os.listdir(link_folder_path)):
+            if not (f.startswith("frame_") and f.lower().endswith(".jpg")):
+                continue
+            frame_path = os.path.join(link_folder_path, f)
+            frame_files.append(frame_path)
+            match = _LINK_FRAME_RE.fullmatch(f)
+            if match:
+                self.current_link_frame_numbers[frame_path] = int(match.group(1))
+            # Otherwise the display falls back to the index
 
         self.current_link_frames = frame_files
         if len(self.current_link_frames) > 0:
@@ -251,13 +262,8 @@ class LWErrantMemoryLinksWidget(QWidget):
             # Try to get original frame number if available
             frame_num = self.current_frame_idx + 1  # Default to 1-based index
             if self.current_link_frames and self.current_frame_idx < len(self.current_link_frames):
-                frame_filename = os.path.basename(self.current_link_frames[self.current_frame_idx])
-                try:
-                    # Assumes format "frame_#####.jpg"
-                    frame_num_original = int(frame_filename.split("_")[1].split(".")[0])
-                    frame_num = frame_num_original
-                except (ValueError, IndexError):
-                    pass  # Fallback to index if parsing fails
+                frame_path = self.current_link_frames[self.current_frame_idx]
+                frame_num = self.current_link_frame_numbers.get(frame_path, frame_num)
 
             self.current_display_label.setText(
                 f"Particle ID: {particle_id} | "
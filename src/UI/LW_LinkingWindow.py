@@ -63,6 +63,14 @@ class LWLinkingWindow(QMainWindow):
             self.errant_particle_gallery.set_file_controller(file_controller)
         self.load_initial_overlay()
 
+    def closeEvent(self, event):
+        """Finish background work before the window is torn down."""
+        # A running QThread must not be destroyed with its widget; let any filter apply,
+        # including a debounced edit, finish replacing its output file
+        self.left_panel.filtering_widget.wait_for_pending_filters()
+        self.errant_particle_gallery.stop_overlay_threads()
+        super().closeEvent(event)
+
     def load_initial_overlay(self):
         """Ensure the memory links are loaded when the window opens."""
         if hasattr(self, "left_panel"):
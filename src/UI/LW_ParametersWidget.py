@@ -201,6 +201,11 @@ class LWParametersWidget(QWidget):
         linking_params = self.config_manager.get_linking_params()
         data_folder = self.file_controller.data_folder
 
+        # Link on the output of any pending or running filter apply, not a stale file
+        filtering_widget = getattr(self.trajectory_plotting, "filtering_widget", None)
+        if filtering_widget:
+            filtering_widget.wait_for_pending_filters()
+
         # Use FileController to get file paths
         all_particles_file = self.file_controller.get_data_file_path("all_particles.csv")
         filtered_particles_file = self.file_controller.get_data_file_path("filtered_particles.csv")
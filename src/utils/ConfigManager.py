@@ -78,6 +78,10 @@ class ConfigManager:
             "drift": "false",
         }
 
+        self.config["Filtering"] = {
+            "high_precision": "false",
+        }
+
     def get(self, section: str, key: str, fallback: Any = None) -> Any:
         """
         Get a configuration value.
@@ -11,10 +11,17 @@ Date: 2025-12-08
 """
 
 import os
+import re
 import shutil
+import threading
 import pandas as pd
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
 from .ConfigManager import ConfigManager
 
+# Extracted frame images are named "frame_#####.jpg"
+FRAME_FILENAME_RE = re.compile(r"frame_(\d+)\.jpg")
+
 
 class FileController:
     """Centralized controller for all file and folder operations."""
@@ -91,6 +98,53 @@ class FileController:
         """
         os.makedirs(folder_path, exist_ok=True)
 
+    def _write_csv(self, df: pd.DataFrame, file_path: str) -> None:
+        """
+        Write a DataFrame to CSV in row chunks through a large write buffer.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame to write.
+        file_path : str
+            Path of the CSV file to write.
+
+        Returns
+        -------
+        None
+        """
+        # Rows are formatted 100k at a time and flushed through a 1 MiB buffer, so large
+        # frames are never stringified all at once and disk writes stay few and large
+        with self._replace_on_success(file_path) as temp_path:
+            with open(temp_path, "w", buffering=1 << 20, newline="") as f:
+                df.to_csv(f, index=False, chunksize=100_000)
+
+    @contextmanager
+    def _replace_on_success(self, file_path: str) -> Iterator[str]:
+        """
+        Provide a temporary path next to a file and move it over the file once written.
+
+        Parameters
+        ----------
+        file_path : str
+            Path of the file being written.
+
+        Yields
+        ------
+        str
+            Temporary path to write the new contents to.
+        """
+        # Data files are rewritten on worker threads while the GUI thread may read them;
+        # os.replace is atomic, so readers see either the old file or the complete new one.
+        # The name is unique per thread so concurrent writers don't share a temp file
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            yield temp_path
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     def _delete_file_if_exists(self, file_path: str) -> None:
         """
         Delete a file if it exists to ensure clean overwrite.
@@ -226,9 +280,8 @@ class FileController:
         """
         self.ensure_folder_exists(self.data_folder)
         file_path = os.path.join(self.data_folder, filename)
-        # Delete existing file to ensure clean overwrite
-        self._delete_file_if_exists(file_path)
-        particles_df.to_csv(file_path, index=False)
+        # Replaced atomically rather than deleted first, so readers never find it missing
+        self._write_csv(particles_df, file_path)
         print(f"Saved particles data to: {file_path}")
         return file_path
 
@@ -252,9 +305,8 @@ class FileController:
         """
         self.ensure_folder_exists(self.data_folder)
         file_path = os.path.join(self.data_folder, filename)
-        # Delete existing file to ensure clean overwrite
-        self._delete_file_if_exists(file_path)
-        trajectories_df.to_csv(file_path, index=False)
+        # Replaced atomically rather than deleted first, so readers never find it missing
+        self._write_csv(trajectories_df, file_path)
         print(f"Saved trajectories data to: {file_path}")
         return file_path
 
@@ -316,6 +368,93 @@ class FileController:
         """
         return os.path.join(self.data_folder, filename)
 
+    def get_data_file_signature(self, filename: str) -> Optional[tuple]:
+        """
+        Identify the current contents of a data file by its path, modification time and size.
+
+        Parameters
+        ----------
+        filename : str
+            Name of the file in the data folder.
+
+        Returns
+        -------
+        Optional[tuple]
+            (path, mtime in ns, size), or None if the file doesn't exist.
+        """
+        file_path = self.get_data_file_path(filename)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (file_path, stat.st_mtime_ns, stat.st_size)
+
+    def copy_data_file(self, source_filename: str, filename: str) -> str:
+        """
+        Copy a file within the data folder byte for byte.
+
+        Parameters
+        ----------
+        source_filename : str
+            Name of the file to copy.
+        filename : str
+            Name of the copy. If it is the source itself, nothing is written.
+
+        Returns
+        -------
+        str
+            Path to the copy.
+        """
+        source_path = self.get_data_file_path(source_filename)
+        file_path = self.get_data_file_path(filename)
+        if os.path.abspath(source_path) != os.path.abspath(file_path):
+            with self._replace_on_success(file_path) as temp_path:
+                shutil.copyfile(source_path, temp_path)
+            print(f"Copied {source_path} to: {file_path}")
+        return file_path
+
+    def filter_data_file_in_chunks(
+        self,
+        source_filename: str,
+        filename: str,
+        filter_chunk: Callable[[pd.DataFrame], pd.DataFrame],
+        chunksize: int = 200_000,
+    ) -> Tuple[str, int, int]:
+        """
+        Filter a data file into another chunk by chunk, holding only one chunk in memory.
+
+        Parameters
+        ----------
+        source_filename : str
+            Name of the file to read.
+        filename : str
+            Name of the file to write. May be the source itself.
+        filter_chunk : Callable[[pd.DataFrame], pd.DataFrame]
+            Returns the rows of a chunk to keep.
+        chunksize : int, optional
+            Rows parsed per chunk. Defaults to 200,000.
+
+        Returns
+        -------
+        Tuple[str, int, int]
+            Path to the written file, number of rows read, and number of rows kept.
+        """
+        source_path = self.get_data_file_path(source_filename)
+        file_path = self.get_data_file_path(filename)
+        row_count = 0
+        kept_count = 0
+        # Written next to the target and swapped in, so the source can also be the output
+        with self._replace_on_success(file_path) as temp_path:
+            with open(temp_path, "w", buffering=1 << 20, newline="") as f:
+                # Header first, so a source without rows still gives a file with its columns
+                pd.read_csv(source_path, nrows=0).to_csv(f, index=False)
+                for chunk in pd.read_csv(source_path, chunksize=chunksize):
+                    row_count += len(chunk)
+                    kept = filter_chunk(chunk)
+                    kept_count += len(kept)
+                    kept.to_csv(f, index=False, header=False)
+        return file_path, row_count, kept_count
+
     def backup_particles_data(self, backup_filename: str = "old_all_particles.csv") -> bool:
         """
         Create a backup of the current particles data.
@@ -388,7 +527,7 @@ class FileController:
         save_path = os.path.join(save_folder, filename)
         # Delete existing file to ensure clean overwrite
         self._delete_file_if_exists(save_path)
-        data.to_csv(save_path, index=False)
+        self._write_csv(data, save_path)
         print(f"Saved to save folder: {save_path}")
         return save_path
 
@@ -435,7 +574,7 @@ class FileController:
         str
             Path to the saved file
         """
-        # save_particles_data already handles deletion, so just call it
+        # save_particles_data already replaces the file atomically, so just call it
         return self.save_particles_data(filtered_df, filename)
 
     def copy_file_to_save_folder(self, source_path: str, filename: str) -> str:
@@ -605,13 +744,11 @@ class FileController:
 
         frame_files = []
         for f in all_files:
-            if f.startswith("frame_") and f.endswith(".jpg"):
-                try:
-                    frame_num = int(f.split("_")[-1].split(".")[0])
-                    if (start is None or frame_num >= start) and (end is None or frame_num <= end):
-                        frame_files.append(os.path.join(self.original_frames_folder, f))
-                except (ValueError, IndexError):
-                    continue
+            match = FRAME_FILENAME_RE.fullmatch(f)
+            if match:
+                frame_num = int(match.group(1))
+                if (start is None or frame_num >= start) and (end is None or frame_num <= end):
+                    frame_files.append(os.path.join(self.original_frames_folder, f))
 
         if step is not None and step > 1:
             return frame_files[::step]
@@ -150,8 +150,64 @@ def find_particles_in_frames(image_paths, params=None, progress_callback=None):
     return combined_features
 
 
+def _smallest_indices(values, count):
+    """
+    Return positions of the smallest non-NaN values, in ascending order.
+
+    Parameters
+    ----------
+    values : numpy array
+        1-D array of scores
+    count : int
+        Maximum number of positions to return
+
+    Returns
+    -------
+    numpy array
+        Integer positions into values
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) > count:
+        # Partition only to find the cutoff score; argpartition picks arbitrarily among
+        # values tied at the cutoff, so those are taken in position order instead, as
+        # nsmallest(keep="first") does
+        scores = values[valid]
+        cutoff = np.partition(scores, count - 1)[count - 1]
+        below = np.flatnonzero(scores < cutoff)
+        at_cutoff = np.flatnonzero(scores == cutoff)[: count - len(below)]
+        valid = valid[np.sort(np.concatenate((below, at_cutoff)))]
+    # valid is in position order, so the stable sort breaks ties by position
+    return valid[np.argsort(values[valid], kind="stable")]
+
+
+def _load_errant_source_frame(frame_num, frame_cache):
+    """
+    Read a source frame and its crosshair color, reusing earlier reads of the same frame.
+
+    Parameters
+    ----------
+    frame_num : int
+        Frame number to load
+    frame_cache : dict
+        Maps frame number to (image, cross_color) for frames already loaded
+
+    Returns
+    -------
+    tuple
+        (image, cross_color), with image None if the frame could not be read
+    """
+    if frame_num not in frame_cache:
+        image = cv2.imread(file_controller.get_frame_path(frame_num))
+        cross_color = None
+        if image is not None:
+            # Matches the color used for annotation circles on the full frame
+            cross_color = calculate_optimal_annotation_color(image, _get_invert_setting())
+        frame_cache[frame_num] = (image, cross_color)
+    return frame_cache[frame_num]
+
+
 def _process_errant_particle(
-    particle, particle_counter, particle_type, min_mass=None, min_size=None
+    particle, particle_counter, particle_type, min_mass=None, min_size=None, frame_cache=None
 ):
     """
     Process a single errant particle: crop, resize, draw crosshair, and save.
@@ -168,6 +224,8 @@ def _process_errant_particle(
         Minimum mass value for mass-based particles
     min_size : float, optional
         Minimum size value for size-based particles
+    frame_cache : dict, optional
+        Shared cache of decoded source frames, see _load_errant_source_frame
 
     Returns
     -------
@@ -177,8 +235,9 @@ def _process_errant_particle(
     frame_num = int(particle["frame"])
     x, y = particle["x"], particle["y"]
 
-    image_path = file_controller.get_frame_path(frame_num)
-    image_to_crop = cv2.imread(image_path)
+    if frame_cache is None:
+        frame_cache = {}
+    image_to_crop, cross_color = _load_errant_source_frame(frame_num, frame_cache)
     if image_to_crop is None:
         return None
 
@@ -199,11 +258,6 @@ def _process_errant_particle(
     center_y = final_display_size // 2
     cross_size = 5
 
-    # Get invert setting and calculate optimal cross color using the original full frame
-    # This matches the color used for annotation circles on the full frame
-    invert = _get_invert_setting()
-    cross_color = calculate_optimal_annotation_color(image_to_crop, invert)
-
     cv2.line(
         particle_image,
         (center_x - cross_size, center_y),
@@ -266,18 +320,16 @@ def save_errant_particle_crops_for_frame(params):
     if all_particles.empty:
         return
 
-    min_size = all_particles["size"].min()
+    mass = all_particles["mass"].to_numpy(dtype=np.float64)
+    size = all_particles["size"].to_numpy(dtype=np.float64)
+    min_size = float(np.nanmin(size))
     min_mass = float(params.get("min_mass", 100.0))
 
-    # Calculate errant scores for all particles
-    all_particles["mass_diff"] = all_particles["mass"] - min_mass
-    all_particles["size_diff"] = abs(all_particles["size"] - min_size)
-
-    # Get top 5 most errant by mass and size
-    top_5_mass_particles = all_particles.nsmallest(5, "mass_diff")
-    top_5_size_particles = all_particles.nsmallest(5, "size_diff")
+    # Calculate errant scores for all particles and get the top 5 by mass and size
+    top_5_mass_rows = _smallest_indices(mass - min_mass, 5)
+    top_5_size_rows = _smallest_indices(np.abs(size - min_size), 5)
 
-    if top_5_mass_particles.empty and top_5_size_particles.empty:
+    if len(top_5_mass_rows) == 0 and len(top_5_size_rows) == 0:
         return
 
     file_controller.delete_all_files_in_folder(file_controller.errant_particles_folder)
@@ -285,20 +337,30 @@ def save_errant_particle_crops_for_frame(params):
 
     errant_particles_data = []
     particle_counter = 0
+    # Errant particles often share frames, so each frame is decoded only once
+    frame_cache = {}
 
     # Process mass-based errant particles
-    for idx, particle in top_5_mass_particles.iterrows():
+    for row in top_5_mass_rows:
         particle_info = _process_errant_particle(
-            particle, particle_counter, "mass", min_mass=min_mass
+            all_particles.iloc[row],
+            particle_counter,
+            "mass",
+            min_mass=min_mass,
+            frame_cache=frame_cache,
         )
         if particle_info:
             errant_particles_data.append(particle_info)
             particle_counter += 1
 
     # Process size-based errant particles
-    for idx, particle in top_5_size_particles.iterrows():
+    for row in top_5_size_rows:
         particle_info = _process_errant_particle(
-            particle, particle_counter, "size", min_size=min_size
+            all_particles.iloc[row],
+            particle_counter,
+            "size",
+            min_size=min_size,
+            frame_cache=frame_cache,
         )
         if particle_info:
             errant_particles_data.append(particle_info)
@@ -309,6 +371,30 @@ def save_errant_particle_crops_for_frame(params):
         json.dump(errant_particles_data, f, indent=4)
 
 
+def _percentile_value(gray, percentile):
+    """
+    Get the pixel value at a percentile of a grayscale image.
+
+    Parameters
+    ----------
+    gray : numpy array
+        Grayscale image
+    percentile : float
+        Percentile (0-100)
+
+    Returns
+    -------
+    float
+        Pixel value at the percentile
+    """
+    # The endpoints are just the min and max, which skip the partition np.percentile does
+    if percentile <= 0:
+        return float(gray.min())
+    if percentile >= 100:
+        return float(gray.max())
+    return np.percentile(gray, percentile)
+
+
 def _apply_thresholding(gray1, gray2, threshold_percent, invert):
     """
     Apply thresholding to two grayscale images.
@@ -327,9 +413,13 @@ def _apply_thresholding(gray1, gray2, threshold_percent, invert):
     tuple
         (thresh1, thresh2) thresholded images with white background and dark particles
     """
+    if threshold_percent <= 0:
+        # No pixel is brighter than the maximum, so both images are pure background
+        return np.full_like(gray1, 255), np.full_like(gray2, 255)
+
     percentile = 100 - threshold_percent
-    threshold_val1 = np.percentile(gray1.flatten(), percentile)
-    threshold_val2 = np.percentile(gray2.flatten(), percentile)
+    threshold_val1 = _percentile_value(gray1, percentile)
+    threshold_val2 = _percentile_value(gray2, percentile)
 
     # Both invert and non-invert cases use THRESH_BINARY_INV
     # The logic is the same regardless of invert setting
@@ -468,6 +558,34 @@ def calculate_optimal_annotation_color(image, invert=False):
     return tuple(annotation_color)
 
 
+def _build_rb_overlay_palette():
+    """
+    Build the RGB colors of the red-blue overlay for every particle mask combination.
+
+    Returns
+    -------
+    numpy array
+        (4, 3) uint8 array indexed by ``particle1 | (particle2 << 1)``
+    """
+    white = np.array([255, 255, 255], dtype=np.float64)
+    red = np.array([0, 0, 255], dtype=np.float64)  # BGR
+    blue = np.array([255, 0, 0], dtype=np.float64)  # BGR
+
+    # Overlay at 50% opacity
+    alpha = 0.5
+    palette = np.empty((4, 3), dtype=np.uint8)
+    for index in range(4):
+        red_layer = red if index & 1 else white
+        blue_layer = blue if index & 2 else white
+        palette[index] = (alpha * red_layer + (1 - alpha) * blue_layer).astype(np.uint8)
+
+    # Convert BGR to RGB
+    return palette[:, ::-1].copy()
+
+
+_RB_OVERLAY_PALETTE = _build_rb_overlay_palette()
+
+
 def _create_rb_overlay_from_thresholds(thresh1, thresh2, height, width):
     """
     Create red-blue overlay from thresholded images.
@@ -484,29 +602,10 @@ def _create_rb_overlay_from_thresholds(thresh1, thresh2, height, width):
     numpy array
         RB overlay image (RGB format)
     """
-    # Create white background RGB image
-    rb_overlay = np.ones((height, width, 3), dtype=np.uint8) * 255
-
-    # Create red image for frame 1: dark pixels (particles) become red
-    red_overlay = rb_overlay.copy()
-    particle_mask1 = thresh1 == 0
-    red_overlay[particle_mask1, 0] = 0  # B channel
-    red_overlay[particle_mask1, 1] = 0  # G channel
-    red_overlay[particle_mask1, 2] = 255  # R channel (red)
-
-    # Create blue image for frame 2: dark pixels (particles) become blue
-    blue_overlay = rb_overlay.copy()
-    particle_mask2 = thresh2 == 0
-    blue_overlay[particle_mask2, 0] = 255  # B channel (blue)
-    blue_overlay[particle_mask2, 1] = 0  # G channel
-    blue_overlay[particle_mask2, 2] = 0  # R channel
-
-    # Overlay at 50% opacity
-    alpha = 0.5
-    rb_overlay = (alpha * red_overlay + (1 - alpha) * blue_overlay).astype(np.uint8)
-
-    # Convert BGR to RGB
-    return cv2.cvtColor(rb_overlay, cv2.COLOR_BGR2RGB)
+    # Index each pixel by which frames mark it as a particle and look up its
+    # blended color in a single vectorized pass
+    overlay_index = (thresh1 == 0).view(np.uint8) | ((thresh2 == 0).view(np.uint8) << 1)
+    return _RB_OVERLAY_PALETTE[overlay_index]
 
 
 def create_full_frame_rb_overlay(frame1, frame2, threshold_percent=50):
@@ -554,9 +653,9 @@ def create_rb_overlay_image(crop1, crop2, x1, y1, x2, y2, threshold_percent=50,
     Parameters
     ----------
     crop1 : numpy array
-        First cropped frame (BGR)
+        First cropped frame (BGR or grayscale)
     crop2 : numpy array
-        Second cropped frame (BGR)
+        Second cropped frame (BGR or grayscale)
     x1, y1 : float
         Particle position in crop1 (relative to crop origin)
     x2, y2 : float
@@ -580,8 +679,8 @@ def create_rb_overlay_image(crop1, crop2, x1, y1, x2, y2, threshold_percent=50,
         crop2 = cv2.resize(crop2, target_size)
 
     # Convert to grayscale for thresholding
-    gray1 = cv2.cvtColor(crop1, cv2.COLOR_BGR2GRAY)
-    gray2 = cv2.cvtColor(crop2, cv2.COLOR_BGR2GRAY)
+    gray1 = crop1 if crop1.ndim == 2 else cv2.cvtColor(crop1, cv2.COLOR_BGR2GRAY)
+    gray2 = crop2 if crop2.ndim == 2 else cv2.cvtColor(crop2, cv2.COLOR_BGR2GRAY)
 
     # Apply thresholding
     invert = _get_invert_setting()
@@ -680,71 +779,90 @@ def create_errant_distance_links_gallery(
     if max_displays is None:
         max_displays = int(linking_params.get("max_displays", 5))
 
-    # For each particle, find its single worst link
-    unique_particles = trajectories["particle"].unique()
+    # For each particle, find its single worst link. Row positions per particle are
+    # indexed once (in order of first appearance) instead of masking the table per particle
+    rows_by_particle = trajectories.groupby("particle", sort=False).indices
     worst_links_per_particle = []
 
-    for particle_id in unique_particles:
-        particle_data = trajectories[trajectories["particle"] == particle_id].sort_values("frame")
+    for particle_id, particle_rows in rows_by_particle.items():
+        particle_data = trajectories.iloc[particle_rows].sort_values("frame")
 
         if len(particle_data) < 2:
             continue
 
-        particle_links = []
-        for i in range(len(particle_data) - 1):
-            curr = particle_data.iloc[i]
-            next_p = particle_data.iloc[i + 1]
-
-            # Get frame numbers
-            frame_i = int(curr["frame"])
-            frame_i1 = int(next_p["frame"])
-
-            # NEW CONDITION: only consider ordinally next frames
-            if frame_i1 != (frame_i + 1):
-                continue  # Skip this link if there's a frame gap
-
-            jump_dist = np.sqrt((next_p["x"] - curr["x"]) ** 2 + (next_p["y"] - curr["y"]) ** 2)
-            deviation = max(0, jump_dist - search_range)
-            link_score = deviation
-
-            if np.isnan(link_score) or not np.isfinite(link_score):
-                continue
-
-            issues = []
-            if jump_dist > search_range:
-                excess = jump_dist - search_range
-                issues.append(
-                    f"Jump distance ({jump_dist:.2f} px) exceeds search_range ({search_range} px) by {excess:.2f} px"
-                )
-            else:
-                issues.append(
-                    f"Jump distance ({jump_dist:.2f} px) is within search_range ({search_range} px)"
-                )
-
-            link_info = {
-                "particle_id": int(particle_id),
-                "score": link_score,
+        # Extract all positions at once and score every consecutive link in one pass
+        frames = particle_data["frame"].to_numpy()
+        x = particle_data["x"].to_numpy(dtype=float)
+        y = particle_data["y"].to_numpy(dtype=float)
+        jump_dists = np.sqrt(np.diff(x) ** 2 + np.diff(y) ** 2)
+        excess = jump_dists - search_range
+        deviations = np.where(excess > 0, excess, 0.0)
+
+        # Only consider ordinally next frames (no frame gap) with a finite score
+        valid = (frames[1:] == frames[:-1] + 1) & np.isfinite(deviations)
+        candidates = np.flatnonzero(valid)
+        if len(candidates) == 0:
+            continue
+
+        # Find the worst link for this particle (first one on ties) and add it to our list
+        # as a plain (score, particle, row) record; metadata is only built for the top links
+        i = candidates[np.argmax(deviations[candidates])]
+        worst_links_per_particle.append(
+            (
+                deviations[i],
+                int(particle_id),
+                jump_dists[i],
+                int(frames[i]),
+                int(frames[i + 1]),
+                x[i],
+                y[i],
+                x[i + 1],
+                y[i + 1],
+            )
+        )
+
+    # Sort the list of worst links from all particles to find the top overall
+    worst_links_per_particle.sort(key=lambda link: link[0], reverse=True)
+
+    top_links = []
+    for (
+        deviation,
+        particle_id,
+        jump_dist,
+        frame_i,
+        frame_i1,
+        x_i,
+        y_i,
+        x_i1,
+        y_i1,
+    ) in worst_links_per_particle[:max_displays]:
+        issues = []
+        if jump_dist > search_range:
+            excess = jump_dist - search_range
+            issues.append(
+                f"Jump distance ({jump_dist:.2f} px) exceeds search_range ({search_range} px) by {excess:.2f} px"
+            )
+        else:
+            issues.append(
+                f"Jump distance ({jump_dist:.2f} px) is within search_range ({search_range} px)"
+            )
+
+        top_links.append(
+            {
+                "particle_id": particle_id,
+                "score": deviation,
                 "jump_dist": jump_dist,
                 "deviation": deviation,
                 "frame_i": frame_i,
                 "frame_i1": frame_i1,
-                "x_i": curr["x"],
-                "y_i": curr["y"],
-                "x_i1": next_p["x"],
-                "y_i1": next_p["y"],
+                "x_i": x_i,
+                "y_i": y_i,
+                "x_i1": x_i1,
+                "y_i1": y_i1,
                 "issues": issues,
                 "search_range": search_range,
             }
-            particle_links.append(link_info)
-
-        if particle_links:
-            # Find the worst link for this particle and add it to our list
-            worst_link = max(particle_links, key=lambda x: x["score"])
-            worst_links_per_particle.append(worst_link)
-
-    # Sort the list of worst links from all particles to find the top overall
-    worst_links_per_particle.sort(key=lambda x: x["score"], reverse=True)
-    top_links = worst_links_per_particle[:max_displays]
+        )
 
     if len(top_links) == 0:
         print("⚠️ No problematic trajectory links found to create a gallery.")
@@ -919,37 +1037,37 @@ def find_and_save_high_memory_links(trajectories_file, memory_parameter, max_lin
         return []
 
     memory_links_found = []
-    unique_particles = trajectories["particle"].unique()
+    # Row positions per particle are indexed once (in order of first appearance)
+    # instead of masking the whole table for every particle
+    rows_by_particle = trajectories.groupby("particle", sort=False).indices
 
-    for particle_id in unique_particles:
-        particle_data = trajectories[trajectories["particle"] == particle_id].sort_values("frame")
+    for particle_id, particle_rows in rows_by_particle.items():
+        particle_data = trajectories.iloc[particle_rows].sort_values("frame")
 
         if len(particle_data) < 2:
             continue
 
         frames = particle_data["frame"].values
-        for i in range(len(frames) - 1):
-            frame_gap = frames[i + 1] - frames[i]
-            if frame_gap > 1:
-                memory_used = frame_gap - 1
-                if memory_used < memory_parameter:
-                    last_frame = int(frames[i])
-                    reappear_frame = int(frames[i + 1])
-
-                    start_pos_data = particle_data.iloc[i]
-                    end_pos_data = particle_data.iloc[i + 1]
-
-                    memory_links_found.append(
-                        {
-                            "particle_id": int(particle_id),
-                            "memory_used": int(memory_used),
-                            "last_frame": int(last_frame),
-                            "reappear_frame": int(reappear_frame),
-                            "frames": list(range(last_frame, reappear_frame + 1)),
-                            "start_pos": (float(start_pos_data["x"]), float(start_pos_data["y"])),
-                            "end_pos": (float(end_pos_data["x"]), float(end_pos_data["y"])),
-                        }
-                    )
+        x = particle_data["x"].to_numpy(dtype=float)
+        y = particle_data["y"].to_numpy(dtype=float)
+
+        # Frames the particle was missing for between consecutive detections
+        memory_used = np.diff(frames) - 1
+        for i in np.flatnonzero((memory_used > 0) & (memory_used < memory_parameter)):
+            last_frame = int(frames[i])
+            reappear_frame = int(frames[i + 1])
+
+            memory_links_found.append(
+                {
+                    "particle_id": int(particle_id),
+                    "memory_used": int(memory_used[i]),
+                    "last_frame": last_frame,
+                    "reappear_frame": reappear_frame,
+                    "frames": list(range(last_frame, reappear_frame + 1)),
+                    "start_pos": (float(x[i]), float(y[i])),
+                    "end_pos": (float(x[i + 1]), float(y[i + 1])),
+                }
+            )
 
     memory_links_found.sort(key=lambda x: x["memory_used"], reverse=True)
     top_links = memory_links_found[:max_links]
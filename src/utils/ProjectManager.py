@@ -10,6 +10,7 @@ Date: 2025-12-08
 """
 
 import os
+import json
 import shutil
 import configparser
 from .ConfigManager import ConfigManager
@@ -94,7 +95,8 @@ class ProjectManager:
                 open(os.path.join(data_folder, f), "w").close()
 
             # Create empty filters file
-            open(os.path.join(project_folder_path, "filters.ini"), "w").close()
+            with open(os.path.join(project_folder_path, "filters.json"), "w") as f:
+                json.dump({"filters": [], "compound_filters": []}, f)
 
             # Copy video file to project videos folder if provided
             video_filename = ""
@@ -269,6 +271,11 @@ class ProjectManager:
             "drift": "false",
         }
 
+        # Filtering section
+        config["Filtering"] = {
+            "high_precision": "false",
+        }
+
         with open(config_path, "w") as f:
             config.write(f)
 
@@ -11,7 +11,12 @@ Date: 2025-12-08
 
 from PySide6.QtWidgets import QLabel, QStyle, QStyleOption
 from PySide6.QtGui import QPixmap, QPainter
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
+
+
+def _size_bucket(size):
+    """Round a QSize down to 8 px steps."""
+    return (size.width() & ~7, size.height() & ~7)
 
 
 class ScaledLabel(QLabel):
@@ -36,6 +41,16 @@ class ScaledLabel(QLabel):
         """
         super().__init__(parent)
         self._pixmap = QPixmap()
+        # Last scaled pixmap, the label size it was scaled for, and whether it was smooth-scaled
+        self._scaled_pixmap = None
+        self._scaled_size = None
+        self._scaled_smooth = False
+        # While this timer runs the label is being resized or its pixmap is being swapped
+        # rapidly, so paints use fast scaling; when it fires, one final smooth repaint is done
+        self._interaction_timer = QTimer(self)
+        self._interaction_timer.setSingleShot(True)
+        self._interaction_timer.setInterval(100)
+        self._interaction_timer.timeout.connect(self.update)
 
     def setPixmap(self, pixmap):
         """
@@ -51,8 +66,35 @@ class ScaledLabel(QLabel):
         None
         """
         self._pixmap = pixmap
+        self._scaled_pixmap = None
         self.update()  # Trigger a repaint
 
+    def begin_interaction(self):
+        """
+        Uses fast scaling until the pixmap stops changing, e.g. during a slider drag.
+
+        Returns
+        -------
+        None
+        """
+        self._interaction_timer.start()
+
+    def resizeEvent(self, event):
+        """
+        Restarts the smooth-scaling debounce on every resize.
+
+        Parameters
+        ----------
+        event : QResizeEvent
+            The resize event.
+
+        Returns
+        -------
+        None
+        """
+        super().resizeEvent(event)
+        self._interaction_timer.start()
+
     def paintEvent(self, event):
         """
         Overrides the paint event to draw the scaled pixmap.
@@ -72,11 +114,23 @@ class ScaledLabel(QLabel):
             return
 
         painter = QPainter(self)
-        pixmap_size = self._pixmap.size()
         label_size = self.size()
 
-        # Scale pixmap to fit the label, maintaining aspect ratio
-        scaled_pixmap = self._pixmap.scaled(label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        # Scale pixmap to fit the label, maintaining aspect ratio; only rescale when the size
+        # changed or a fast-scaled pixmap is left over from a finished interaction
+        interacting = self._interaction_timer.isActive()
+        rescale = self._scaled_pixmap is None or (not interacting and not self._scaled_smooth)
+        if not rescale and self._scaled_size != label_size:
+            # While interacting, a pixmap scaled within the same 8 px size bucket is reused
+            rescale = not interacting or _size_bucket(self._scaled_size) != _size_bucket(
+                label_size
+            )
+        if rescale:
+            transformation = Qt.FastTransformation if interacting else Qt.SmoothTransformation
+            self._scaled_pixmap = self._pixmap.scaled(label_size, Qt.KeepAspectRatio, transformation)
+            self._scaled_size = label_size
+            self._scaled_smooth = not interacting
+        scaled_pixmap = self._scaled_pixmap
 
         # Calculate coordinates to center the pixmap
         x = (label_size.width() - scaled_pixmap.width()) / 2
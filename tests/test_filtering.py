@@ -0,0 +1,136 @@
+"""
+Tests for the filtering widget's filter semantics.
+
+Run from the repository root with ``python -m pytest``.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("PySide6")
+
+from src.UI.DW_LW_FilteringWidget import (
+    CompoundFilter,
+    Filter,
+    _coalesce_filters,
+    _filters_keep_all_rows,
+    _update_column_bounds,
+    apply_filters,
+    build_filter_expression,
+    combined_filter_rows,
+)
+from src.utils.ConfigManager import ConfigManager
+from src.utils.FileController import FileController
+
+
+def _boundary_data():
+    # 1.00000001 is above 1.0 in float64 but rounds to exactly 1.0 in float32
+    data = pd.DataFrame({"mass": [1.00000001, 0.5], "frame": [0, 1]})
+    comparison_data = data.astype({"mass": np.float32})
+    return data, comparison_data
+
+
+def _particle_data():
+    return pd.DataFrame(
+        {
+            "mass": [10.0, 60.0, 80.0, 40.0, 55.0, 90.0],
+            "ecc": [0.1, 0.2, 0.7, 0.6, 0.9, 0.3],
+            "frame": [0, 0, 1, 1, 2, 2],
+        }
+    )
+
+
+def test_float32_comparison_rounds_boundary_value():
+    data, comparison_data = _boundary_data()
+    filtered = apply_filters(data, [Filter("mass", ">", 1.0)], [], comparison_data)
+    assert filtered.empty
+
+
+def test_high_precision_comparison_keeps_boundary_value():
+    data, _ = _boundary_data()
+    filtered = apply_filters(data, [Filter("mass", ">", 1.0)], [], None)
+    assert filtered["mass"].tolist() == [1.00000001]
+    assert filtered["mass"].dtype == np.float64
+
+
+@pytest.mark.parametrize(
+    "compound_operator, expected_masses",
+    [
+        ("AND", [60.0, 90.0]),
+        ("OR", [10.0, 60.0, 80.0, 55.0, 90.0]),
+        ("XOR", [10.0, 80.0, 55.0]),
+    ],
+)
+def test_fused_expression_matches_per_filter_path(compound_operator, expected_masses, capsys):
+    data = _particle_data()
+    compound = [
+        CompoundFilter(Filter("mass", ">", 50.0), Filter("ecc", "<", 0.5), compound_operator)
+    ]
+
+    expression = build_filter_expression(data, [], compound)
+    assert expression is not None
+    fused_rows = np.flatnonzero(data.eval(expression).to_numpy(dtype=bool))
+    per_filter_rows = combined_filter_rows(data, [], compound)
+    assert fused_rows.tolist() == per_filter_rows.tolist()
+
+    filtered = apply_filters(data, [], compound)
+    assert filtered["mass"].tolist() == expected_masses
+    # The fused expression evaluated without falling back to the per-filter path
+    assert "Error evaluating filter expression" not in capsys.readouterr().out
+
+
+def test_coalesced_filters_select_same_rows():
+    data = _particle_data()
+    filters = [
+        Filter("mass", ">", 20.0),
+        Filter("mass", ">", 50.0),
+        Filter("ecc", "<", 0.8),
+        Filter("mass", ">=", 50.0),
+        Filter("ecc", "<", 0.5),
+    ]
+
+    coalesced = _coalesce_filters(filters)
+    assert [(f.parameter, f.operator, f.value) for f in coalesced] == [
+        ("mass", ">", 50.0),
+        ("ecc", "<", 0.5),
+    ]
+    rows = combined_filter_rows(data, filters, [])
+    assert combined_filter_rows(data, coalesced, []).tolist() == rows.tolist()
+    assert apply_filters(data, filters, []).index.tolist() == rows.tolist()
+
+
+def test_chunked_filtering_matches_in_memory(tmp_path):
+    data = _particle_data()
+    data.loc[3, "mass"] = np.nan
+    file_controller = FileController(ConfigManager(), str(tmp_path))
+    file_controller.ensure_folder_exists(file_controller.data_folder)
+    data.to_csv(file_controller.get_data_file_path("all_particles.csv"), index=False)
+    filters = [Filter("mass", ">", 20.0), Filter("frame", "<=", 2)]
+    compound = [CompoundFilter(Filter("mass", ">", 50.0), Filter("ecc", "<", 0.5), "XOR")]
+
+    output_path, row_count, kept_count = file_controller.filter_data_file_in_chunks(
+        "all_particles.csv",
+        "filtered_particles.csv",
+        lambda chunk: apply_filters(chunk, filters, compound),
+        chunksize=2,
+    )
+
+    expected = apply_filters(data, filters, compound).reset_index(drop=True)
+    chunked = pd.read_csv(output_path)
+    assert (row_count, kept_count) == (len(data), len(expected))
+    pd.testing.assert_frame_equal(chunked, expected)
+
+
+def test_bounds_shortcut_does_not_skip_filter_removing_nan_rows():
+    data = _particle_data()
+    data.loc[1, "mass"] = np.nan
+    filters = [Filter("mass", ">", 5.0)]
+    bounds = {}
+    for start in range(0, len(data), 2):
+        _update_column_bounds(bounds, data.iloc[start : start + 2])
+
+    # Every non-NaN mass passes, but the NaN row still fails the comparison
+    assert len(apply_filters(data, filters, [])) == len(data) - 1
+    assert not _filters_keep_all_rows(filters, [], bounds)
+    assert _filters_keep_all_rows([Filter("ecc", ">", 0.0)], [], bounds)